@@ -0,0 +1,134 @@
+"""
+Approximate nearest-neighbour index for the audio-feature space.
+
+An IVF (inverted file) index: unit vectors are partitioned into cells with
+spherical k-means, and a query only scores the rows in the few cells whose
+centroids are closest to it. Runs on the CPU with NumPy only.
+
+Tuning knobs:
+- n_cells: More cells means smaller cells and faster queries, at lower recall
+- n_probe: More probed cells means higher recall, at higher latency
+"""
+
+import numpy as np
+
+# Rows assigned to centroids per matrix product during build
+ASSIGN_CHUNK_ROWS = 65536
+
+
+class IVFIndex:
+    """
+    Inverted-file index over L2-normalized vectors for cosine similarity.
+    
+    Rows are stored grouped by cell, so scanning a probed cell reads one
+    contiguous block of memory.
+    """
+    
+    def __init__(self, vectors, n_cells=None, n_iter=10, sample_size=None, seed=0):
+        """
+        Build the index with spherical k-means.
+        
+        Args:
+            vectors: Unit vectors of shape (n_rows, n_dims)
+            n_cells: Number of coarse cells (defaults to about sqrt(n_rows))
+            n_iter: Number of k-means iterations
+            sample_size: Rows used to train centroids (defaults to 256 per cell)
+            seed: Random seed for centroid initialization and sampling
+        """
+        vectors = np.ascontiguousarray(vectors)
+        n_rows = vectors.shape[0]
+        if n_cells is None:
+            n_cells = int(np.sqrt(n_rows))
+        n_cells = max(1, min(int(n_cells), n_rows))
+        if sample_size is None:
+            sample_size = 256 * n_cells
+        
+        rng = np.random.default_rng(seed)
+        if sample_size < n_rows:
+            sample = vectors[rng.choice(n_rows, sample_size, replace=False)]
+        else:
+            sample = vectors
+        
+        self.centroids = self._train(sample, n_cells, n_iter, rng)
+        assignments = self._assign(vectors)
+        
+        self.order = np.argsort(assignments, kind='stable')
+        self.offsets = np.searchsorted(
+            assignments[self.order], np.arange(n_cells + 1)
+        )
+        self.cell_vectors = np.ascontiguousarray(vectors[self.order])
+    
+    def state(self):
+        """Return the arrays from_state rebuilds the index from."""
+        return {
+            'centroids': self.centroids, 'order': self.order,
+            'offsets': self.offsets, 'cell_vectors': self.cell_vectors
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an index from state() without training or assigning."""
+        index = cls.__new__(cls)
+        vars(index).update(state)
+        return index
+    
+    @property
+    def n_cells(self):
+        """Number of coarse cells."""
+        return self.centroids.shape[0]
+    
+    def _train(self, sample, n_cells, n_iter, rng):
+        """Run spherical k-means on a sample and return unit centroids."""
+        centroids = sample[rng.choice(len(sample), n_cells, replace=False)].copy()
+        for _ in range(n_iter):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            
+            empty = norms == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            norms[norms == 0] = 1
+            centroids = (sums / norms[:, None]).astype(sample.dtype)
+        return centroids
+    
+    def _assign(self, vectors):
+        """Return the nearest cell of every row, in memory-bounded chunks."""
+        labels = np.empty(vectors.shape[0], dtype=np.intp)
+        for start in range(0, vectors.shape[0], ASSIGN_CHUNK_ROWS):
+            block = vectors[start:start + ASSIGN_CHUNK_ROWS]
+            labels[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return labels
+    
+    def search(self, query, n_probe=8, min_candidates=0):
+        """
+        Score the rows in the cells closest to a query.
+        
+        Args:
+            query: Unit vector of shape (n_dims,)
+            n_probe: Number of cells to scan
+            min_candidates: Scan at least this many rows, probing the next
+                closest cells while the first n_probe hold fewer. Callers
+                that drop some rows afterwards pass the results they need
+                plus the rows they may drop, so enough remain.
+            
+        Returns:
+            Tuple of (row positions, cosine similarities) for every scanned row
+        """
+        n_probe = max(1, min(int(n_probe), self.n_cells))
+        cell_scores = self.centroids @ query
+        sizes = np.diff(self.offsets)
+        cells = np.argpartition(-cell_scores, n_probe - 1)[:n_probe]
+        if sizes[cells].sum() < min_candidates and n_probe < self.n_cells:
+            ranked = np.argsort(-cell_scores, kind='stable')
+            scanned = np.cumsum(sizes[ranked])
+            n_probe = min(int(np.searchsorted(scanned, min_candidates)) + 1, self.n_cells)
+            cells = ranked[:n_probe]
+        cells.sort()
+        
+        bounds = [(self.offsets[c], self.offsets[c + 1]) for c in cells]
+        positions = np.concatenate([self.order[start:end] for start, end in bounds])
+        scores = np.concatenate([self.cell_vectors[start:end] @ query for start, end in bounds])
+        return positions, scores
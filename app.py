@@ -4,21 +4,20 @@ A content-based music recommendation app with Spotify-inspired design.
 
 Built with:
 - Streamlit for the web interface
-- scikit-learn for ML (cosine similarity, MinMaxScaler)
-- pandas & numpy for data manipulation
-- plotly for interactive visualizations
+- pandas & numpy for data manipulation, feature scaling and cosine similarity
+- plotly for interactive visualizations (imported when a chart is drawn)
 
 Dataset: Spotify Tracks Dataset
 https://www.kaggle.com/datasets/maharshipandya/-spotify-tracks-dataset
 """
 
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from recommendation_engine import create_recommender
+from recommendation_engine import create_recommender, CARD_COLUMNS
+
+# Song cards rendered per page of search and genre results
+RESULTS_PAGE_SIZE = 20
 
 
 st.set_page_config(
@@ -817,6 +816,22 @@ def render_song_card(track, show_similarity=False):
     """, unsafe_allow_html=True)
 
 
+def render_pager(results, key):
+    """Show a page selector for a result set and return the 0-based page."""
+    n_pages = results.n_pages(RESULTS_PAGE_SIZE)
+    if n_pages == 1:
+        return 0
+    page = st.number_input(
+        f"Page (of {n_pages})",
+        min_value=1,
+        max_value=n_pages,
+        value=1,
+        step=1,
+        key=key
+    )
+    return int(page) - 1
+
+
 def render_feature_bars(features):
     feature_labels = {
         'danceability': ('💃 Danceability', 'How suitable for dancing'),
@@ -858,6 +873,7 @@ def create_radar_chart(features, title="Audio Features"):
     values.append(values[0])
     categories.append(categories[0])
     
+    import plotly.graph_objects as go
     fig = go.Figure()
     
     fig.add_trace(go.Scatterpolar(
@@ -902,6 +918,7 @@ def create_feature_comparison_chart(tracks_data):
     df = pd.DataFrame(tracks_data)
     features = ['danceability', 'energy', 'valence']
     
+    import plotly.graph_objects as go
     fig = go.Figure()
     
     colors = ['#1DB954', '#1ed760', '#1aa34a', '#0d7a32', '#085c26']
@@ -951,7 +968,9 @@ def create_feature_comparison_chart(tracks_data):
 @st.cache_resource
 def get_recommender():
     """Cache the recommender to avoid reloading on each interaction."""
-    return create_recommender()
+    # Shared by every session's thread: one BLAS thread per product keeps
+    # concurrent sessions from oversubscribing the cores
+    return create_recommender(low_memory=True, blas_threads=1)
 
 
 def main():
@@ -998,7 +1017,7 @@ def main():
     col1, col2, col3, col4 = st.columns(4)
     
     from data.loader import get_dataset_stats
-    stats = get_dataset_stats()
+    stats = get_dataset_stats(recommender.df)
     
     with col1:
         st.markdown(f"""
@@ -1040,7 +1059,7 @@ def main():
         search_query = st.text_input("Search by song or artist name", placeholder="e.g., Blinding Lights, Drake, Adele...")
         
         if search_query and len(search_query) >= 2:
-            search_results = recommender.search_tracks(search_query)[:100]
+            search_results = recommender.autocomplete(search_query, 100)
             if search_results:
                 track_options = {f"{t['track_name']} - {t['artists']}": t['track_id'] for t in search_results}
             else:
@@ -1088,7 +1107,8 @@ def main():
             recommendations = recommender.get_recommendations(
                 track_id, 
                 n_recommendations=n_recommendations,
-                exclude_same_artist=exclude_same_artist
+                exclude_same_artist=exclude_same_artist,
+                columns=CARD_COLUMNS
             )
             
             if recommendations:
@@ -1138,7 +1158,8 @@ def main():
             
             recommendations = recommender.get_mood_based_recommendations(
                 st.session_state.selected_mood, 
-                n_recommendations=n_recommendations
+                n_recommendations=n_recommendations,
+                columns=CARD_COLUMNS
             )
             
             cols = st.columns(2)
@@ -1181,7 +1202,8 @@ def main():
         if st.button("🎯 Get Recommendations", use_container_width=True):
             recommendations = recommender.get_recommendations_by_features(
                 features_dict, 
-                n_recommendations=n_recommendations
+                n_recommendations=n_recommendations,
+                columns=CARD_COLUMNS
             )
             
             st.markdown('<div class="section-header">🎵 Songs Matching Your Profile</div>', unsafe_allow_html=True)
@@ -1206,8 +1228,9 @@ def main():
             if results:
                 st.markdown(f'<div class="section-header">📋 Found {len(results)} Results</div>', unsafe_allow_html=True)
                 
+                page = render_pager(results, key=f"search_page_{search_query}")
                 cols = st.columns(2)
-                for i, track in enumerate(results):
+                for i, track in enumerate(results.page(page, RESULTS_PAGE_SIZE)):
                     with cols[i % 2]:
                         render_song_card(track)
             else:
@@ -1223,11 +1246,12 @@ def main():
                         st.session_state.selected_genre = genre
             
             if 'selected_genre' in st.session_state and st.session_state.selected_genre:
-                genre_tracks = recommender.get_tracks_by_genre(st.session_state.selected_genre)
+                genre_tracks = recommender.browse_genre(st.session_state.selected_genre)
                 st.markdown(f'<div class="section-header">🎵 {st.session_state.selected_genre.title()} Tracks</div>', unsafe_allow_html=True)
                 
+                page = render_pager(genre_tracks, key=f"genre_page_{st.session_state.selected_genre}")
                 cols = st.columns(2)
-                for i, track in enumerate(genre_tracks):
+                for i, track in enumerate(genre_tracks.page(page, RESULTS_PAGE_SIZE)):
                     with cols[i % 2]:
                         render_song_card(track)
     
@@ -0,0 +1,167 @@
+"""
+Integer artist codes and per-artist row lists.
+
+Every row's artist credit (e.g. "Daft Punk;Pharrell Williams") is encoded
+as an integer credit code. Credits are also split on ';' into individual
+artists, each with a sorted list of the rows it appears on. Same-artist
+exclusion and "only this artist" filters can then touch just the handful
+of rows involved instead of comparing strings across the whole catalog.
+
+Posting lists are stored in CSR form: the rows of entry i are
+rows[offsets[i]:offsets[i + 1]].
+"""
+
+import numpy as np
+import pandas as pd
+
+# Separator between artists in a multi-artist credit
+CREDIT_SEPARATOR = ';'
+
+
+def split_credit(credit):
+    """Return the distinct artist names of a credit, in credit order."""
+    return list(dict.fromkeys(
+        name.strip() for name in str(credit).split(CREDIT_SEPARATOR) if name.strip()
+    ))
+
+
+def credits_naming(credits, names):
+    """
+    Return a mask of the credits that name any of some artists.
+    
+    A vectorized form of checking split_credit(credit) against names, for
+    credits no ArtistIndex covers.
+    """
+    credits = pd.Series(credits, dtype=object, copy=False).reset_index(drop=True)
+    names = [name for name in names if name]
+    mask = np.zeros(len(credits), dtype=bool)
+    if names and len(credits):
+        parts = credits.astype(str).str.split(CREDIT_SEPARATOR).explode().str.strip()
+        mask[parts.index[parts.isin(names)]] = True
+    return mask
+
+
+def _postings(codes, n_codes):
+    """Group row positions by code into (offsets, rows) CSR arrays."""
+    order = np.argsort(codes, kind='stable')
+    offsets = np.searchsorted(codes[order], np.arange(n_codes + 1))
+    return offsets, order.astype(np.int32)
+
+
+class ArtistIndex:
+    """Credit codes and per-credit and per-artist row lists."""
+    
+    def __init__(self, artists):
+        """
+        Args:
+            artists: Artist credit string of every row
+        """
+        codes, credits = pd.factorize(pd.Series(artists, copy=False))
+        self.codes = codes.astype(np.int32)
+        self.credits = [str(credit) for credit in credits]
+        self.credit_codes = {credit: code for code, credit in enumerate(self.credits)}
+        self.credit_offsets, self.credit_rows = _postings(self.codes, len(self.credits))
+        
+        # Split each distinct credit once, then expand to rows
+        self.artist_ids = {}
+        credit_artists = []
+        lengths = np.zeros(len(self.credits), dtype=np.intp)
+        for code, credit in enumerate(self.credits):
+            ids = [self.artist_ids.setdefault(name, len(self.artist_ids))
+                   for name in split_credit(credit)]
+            credit_artists.extend(ids)
+            lengths[code] = len(ids)
+        self.artist_names = list(self.artist_ids)
+        self.credit_artist_offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.credit_artists = np.array(credit_artists, dtype=np.int32)
+        
+        row_lengths = lengths[self.codes]
+        rows = np.repeat(np.arange(len(self.codes)), row_lengths)
+        within = np.arange(len(rows)) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        row_artists = self.credit_artists[self.credit_artist_offsets[self.codes][rows] + within]
+        self.artist_offsets, order = _postings(row_artists, len(self.artist_names))
+        self.artist_rows = rows[order].astype(np.int32)
+    
+    def state(self):
+        """Return the arrays and string lists from_state rebuilds the index from."""
+        return {
+            'codes': self.codes, 'credits': self.credits,
+            'credit_offsets': self.credit_offsets, 'credit_rows': self.credit_rows,
+            'artist_names': self.artist_names,
+            'credit_artist_offsets': self.credit_artist_offsets,
+            'credit_artists': self.credit_artists,
+            'artist_offsets': self.artist_offsets, 'artist_rows': self.artist_rows
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an index from state() without splitting any credit."""
+        index = cls.__new__(cls)
+        vars(index).update(state)
+        index.credit_codes = {credit: code for code, credit in enumerate(index.credits)}
+        index.artist_ids = {name: i for i, name in enumerate(index.artist_names)}
+        return index
+    
+    def lookup(self, name):
+        """Return the id of an individual artist, or None if it is unknown."""
+        return self.artist_ids.get(str(name).strip())
+    
+    def artists_of(self, row):
+        """Return the individual artist ids credited on a row."""
+        code = self.codes[row]
+        return self.credit_artists[self.credit_artist_offsets[code]:self.credit_artist_offsets[code + 1]]
+    
+    def artist_rows_of(self, artist_id):
+        """Return the sorted rows crediting an individual artist."""
+        return self.artist_rows[self.artist_offsets[artist_id]:self.artist_offsets[artist_id + 1]]
+    
+    def related_rows(self, row, split_artists=False):
+        """
+        Return the sorted rows sharing an artist with a row (the row included).
+        
+        Args:
+            row: Row position of the reference track
+            split_artists: Match any individual artist of a multi-artist
+                credit instead of the exact credit string
+                
+        Returns:
+            NumPy array of row positions
+        """
+        artist_ids = self.artists_of(row)
+        if not split_artists or not len(artist_ids):
+            return self._credit_rows_of(self.codes[row])
+        return self._union_rows(artist_ids)
+    
+    def rows_of_credit(self, credit, split_artists=False):
+        """
+        Return the sorted rows sharing an artist with a credit string.
+        
+        Like related_rows, but the credit need not appear in the index.
+        """
+        credit = str(credit)
+        names = split_credit(credit)
+        if not split_artists or not names:
+            code = self.credit_codes.get(credit)
+            if code is None:
+                return np.empty(0, dtype=np.int32)
+            return self._credit_rows_of(code)
+        return self._union_rows([self.artist_ids[name] for name in names if name in self.artist_ids])
+    
+    def _credit_rows_of(self, code):
+        """Return the sorted rows of a credit code."""
+        # The stable sort in _postings keeps each credit's rows in order
+        return self.credit_rows[self.credit_offsets[code]:self.credit_offsets[code + 1]]
+    
+    def _union_rows(self, artist_ids):
+        """Return the sorted rows crediting any of several artists."""
+        if len(artist_ids) == 1:
+            return self.artist_rows_of(artist_ids[0])
+        if not len(artist_ids):
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate([self.artist_rows_of(a) for a in artist_ids]))
+    
+    def shares_artist(self, rows, row, split_artists=False):
+        """Return a boolean mask of which rows share an artist with a row."""
+        if not split_artists:
+            return self.codes[rows] == self.codes[row]
+        return np.isin(rows, self.related_rows(row, True))
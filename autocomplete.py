@@ -0,0 +1,198 @@
+"""
+Popularity-ranked prefix autocomplete for the seed-song picker.
+
+Track names and artists are normalized (lowercased, punctuation collapsed
+to spaces) and every word-aligned suffix ("blinding lights", "lights") is
+stored in a sorted array of UTF-8 keys. A query is normalized the same way
+and binary-searched as a prefix, so "blind", "lights" and "the weeknd" all
+match. Matching rows are returned by descending popularity.
+
+Prefixes that match more than RANGE_LIMIT entries have their top results
+precomputed, so every query ranks at most RANGE_LIMIT entries.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Keys are truncated to this many UTF-8 bytes
+KEY_BYTES = 48
+
+# Largest prefix range ranked at query time
+RANGE_LIMIT = 4096
+
+# Results kept for each precomputed prefix
+MAX_COMPLETIONS = 200
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """Lowercase text and collapse punctuation and whitespace to single spaces."""
+    return _NON_WORD.sub(' ', str(text).lower()).strip()
+
+
+def _word_suffixes(text):
+    """Return every suffix of normalized text that starts at a word."""
+    words = normalize(text).split(' ')
+    return [' '.join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+def matches(text, value):
+    """Return whether normalized text starts a word-aligned suffix of a value."""
+    return any(suffix.startswith(text) for suffix in _word_suffixes(value))
+
+
+def matching(text, values):
+    """
+    Return a mask of the values that match normalized text (see matches).
+    
+    Words of normalized values are separated by single spaces, so text
+    starts a word-aligned suffix exactly where ' ' + text occurs in
+    ' ' + value.
+    """
+    normalized = (
+        pd.Series(values, dtype=object, copy=False).astype(str).str.lower()
+        .str.replace(_NON_WORD, ' ', regex=True).str.strip()
+    )
+    return (' ' + normalized).str.contains(' ' + text, regex=False).to_numpy(dtype=bool)
+
+
+def _encoded_suffixes(text):
+    """Return the set of truncated UTF-8 keys for a value's word suffixes."""
+    return {suffix.encode('utf-8')[:KEY_BYTES] for suffix in _word_suffixes(text)}
+
+
+class PrefixIndex:
+    """Sorted array of word-aligned suffixes with popularity ranking."""
+    
+    def __init__(self, track_names, artists, popularity):
+        """
+        Args:
+            track_names: Track name of every row
+            artists: Artist string of every row
+            popularity: Popularity of every row
+        """
+        keys = []
+        rows = []
+        # Artists repeat a lot, so their keys are computed once per value
+        artist_keys = {}
+        for row, (name, artist) in enumerate(zip(track_names, artists)):
+            if artist not in artist_keys:
+                artist_keys[artist] = _encoded_suffixes(artist)
+            row_keys = _encoded_suffixes(name) | artist_keys[artist]
+            keys.extend(row_keys)
+            rows.extend([row] * len(row_keys))
+        
+        keys = np.array(keys, dtype=f'S{KEY_BYTES}')
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.rows = np.array(rows, dtype=np.int32)[order]
+        self.popularity = np.asarray(popularity)
+        self.track_names = track_names
+        self.artists = artists
+        self.top_by_prefix = self._precompute_large_ranges()
+    
+    def state(self):
+        """
+        Return the arrays from_state rebuilds the index from.
+        
+        The precomputed rankings are stored in CSR form: the rows of
+        prefixes[i] are prefix_rows[prefix_offsets[i]:prefix_offsets[i + 1]].
+        """
+        rankings = list(self.top_by_prefix.values())
+        return {
+            'keys': self.keys, 'rows': self.rows, 'popularity': self.popularity,
+            'prefixes': np.array(list(self.top_by_prefix), dtype=f'S{KEY_BYTES}'),
+            'prefix_offsets': np.concatenate([[0], np.cumsum([len(rows) for rows in rankings])]),
+            'prefix_rows': np.concatenate(rankings) if rankings else np.empty(0, dtype=np.int32)
+        }
+    
+    @classmethod
+    def from_state(cls, state, track_names, artists):
+        """
+        Rebuild an index from state() without computing any suffix.
+        
+        Args:
+            state: Arrays returned by state()
+            track_names: Track name of every row
+            artists: Artist string of every row
+        """
+        index = cls.__new__(cls)
+        index.keys, index.rows = state['keys'], state['rows']
+        index.popularity = state['popularity']
+        index.track_names = track_names
+        index.artists = artists
+        offsets = state['prefix_offsets']
+        index.top_by_prefix = {
+            bytes(prefix): state['prefix_rows'][offsets[i]:offsets[i + 1]]
+            for i, prefix in enumerate(state['prefixes'])
+        }
+        return index
+    
+    def _rank(self, entry_rows, limit):
+        """Return unique rows ordered by popularity (then row), at most limit."""
+        order = np.lexsort((entry_rows, -self.popularity[entry_rows]))
+        ranked = entry_rows[order]
+        _, first = np.unique(ranked, return_index=True)
+        return ranked[np.sort(first)][:limit]
+    
+    def _precompute_large_ranges(self):
+        """Rank every prefix whose range is larger than RANGE_LIMIT."""
+        top_by_prefix = {}
+        # A prefix can only match many entries if its shorter prefix did, so
+        # each length only re-examines the large ranges of the previous one
+        ranges = [(0, len(self.keys))]
+        for length in range(1, KEY_BYTES + 1):
+            next_ranges = []
+            for start, end in ranges:
+                prefixes = self.keys[start:end].astype(f'S{length}')
+                bounds = np.flatnonzero(prefixes[1:] != prefixes[:-1]) + 1
+                run_starts = np.concatenate([[0], bounds])
+                run_ends = np.append(bounds, end - start)
+                for run_start, run_end in zip(run_starts, run_ends):
+                    if run_end - run_start <= RANGE_LIMIT:
+                        continue
+                    prefix = bytes(prefixes[run_start])
+                    # Keys shorter than this length were handled at their own length
+                    if len(prefix) < length:
+                        continue
+                    entry_rows = self.rows[start + run_start:start + run_end]
+                    top_by_prefix[prefix] = self._rank(entry_rows, MAX_COMPLETIONS)
+                    next_ranges.append((start + run_start, start + run_end))
+            ranges = next_ranges
+            if not ranges:
+                break
+        return top_by_prefix
+    
+    def complete(self, query, n=100):
+        """
+        Return the most popular rows with a word-aligned match of the query.
+        
+        Args:
+            query: Text typed so far
+            n: Maximum number of rows
+            
+        Returns:
+            NumPy array of row positions, most popular first
+        """
+        text = normalize(query)
+        if not text:
+            return np.empty(0, dtype=np.int32)
+        prefix = text.encode('utf-8')
+        key = prefix[:KEY_BYTES]
+        
+        if len(prefix) <= KEY_BYTES and key in self.top_by_prefix and n <= MAX_COMPLETIONS:
+            return self.top_by_prefix[key][:n]
+        
+        lo = np.searchsorted(self.keys, key, side='left')
+        # 0xff never occurs in UTF-8, so it sorts after every continuation
+        hi = np.searchsorted(self.keys, key + b'\xff', side='left')
+        entry_rows = self.rows[lo:hi]
+        if len(prefix) > KEY_BYTES:
+            entry_rows = np.array([
+                row for row in entry_rows.tolist()
+                if matches(text, self.track_names[row]) or matches(text, self.artists[row])
+            ], dtype=np.int32)
+        return self._rank(entry_rows, n)
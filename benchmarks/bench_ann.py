@@ -0,0 +1,60 @@
+"""
+Benchmark for the IVF approximate nearest-neighbour index.
+
+Reports recall@k against exact search and per-query latency for several
+numbers of probed cells. Vectors are random points in the unit cube (like
+MinMax-scaled audio features), L2-normalized.
+
+Usage:
+    python benchmarks/bench_ann.py [n_rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import IVFIndex
+from recommendation_engine import select_top_k
+
+N_DIMS = 9
+K = 10
+N_QUERIES = 200
+PROBES = [1, 2, 4, 8, 16, 32]
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(42)
+    vectors = rng.random((n_rows, N_DIMS), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(n_rows, N_QUERIES, replace=False)]
+    
+    start = time.perf_counter()
+    index = IVFIndex(vectors)
+    print(f"Built {index.n_cells} cells over {n_rows:,} rows "
+          f"in {time.perf_counter() - start:.2f}s")
+    
+    start = time.perf_counter()
+    exact = [select_top_k(vectors @ query, K) for query in queries]
+    exact_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+    print(f"{'exact':>8} {'recall@' + str(K):>10} {1.0:>10.3f} {exact_ms:>10.3f} ms")
+    
+    for n_probe in PROBES:
+        hits = 0
+        start = time.perf_counter()
+        for query, truth in zip(queries, exact):
+            positions, scores = index.search(query, n_probe)
+            found = positions[select_top_k(scores, K)]
+            hits += len(np.intersect1d(truth, found))
+        elapsed_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+        recall = hits / (N_QUERIES * K)
+        print(f"{'probe ' + str(n_probe):>8} {'recall@' + str(K):>10} "
+              f"{recall:>10.3f} {elapsed_ms:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
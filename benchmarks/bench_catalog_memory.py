@@ -0,0 +1,46 @@
+"""
+Report the in-memory size of the full and compact catalogs.
+
+Usage:
+    python benchmarks/bench_catalog_memory.py [--csv path]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import loader
+
+
+def frame_mb_per_100k(df):
+    """Return deep memory usage in MB, normalized to 100k tracks."""
+    return df.memory_usage(deep=True).sum() / len(df) * 100_000 / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare catalog memory usage.")
+    parser.add_argument('--csv', default=None, help="Dataset CSV (defaults to data/spotify_full.csv)")
+    args = parser.parse_args()
+    if args.csv:
+        loader.FULL_DATASET_PATH = args.csv
+    
+    full = loader.load_full_dataset()
+    compact = loader.load_full_dataset(compact=True)
+    
+    print(f"{'catalog':>8} {'columns':>8} {'MB / 100k tracks':>18}")
+    for name, df in (('full', full), ('compact', compact)):
+        print(f"{name:>8} {len(df.columns):>8} {frame_mb_per_100k(df):>18.1f}")
+    
+    print()
+    print(f"{'column':>18} {'full MB':>9} {'compact MB':>11}")
+    full_usage = full.memory_usage(deep=True, index=False) / 2**20
+    compact_usage = compact.memory_usage(deep=True, index=False) / 2**20
+    for column in full.columns:
+        compact_mb = f"{compact_usage[column]:.1f}" if column in compact_usage else '-'
+        print(f"{column:>18} {full_usage[column]:>9.1f} {compact_mb:>11}")
+
+
+if __name__ == "__main__":
+    main()
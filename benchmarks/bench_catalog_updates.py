@@ -0,0 +1,124 @@
+"""
+Benchmark for incremental catalog updates.
+
+Times add_tracks, update_tracks and remove_tracks on a live recommender
+against a full index rebuild (compact()), and the cost of queries while
+updates are pending. Also checks that answers given with pending updates
+match the answers after compacting. New tracks copy the features of
+random existing tracks, so they never widen the scaler range.
+
+Usage:
+    python benchmarks/bench_catalog_updates.py [--csv path] [--rounds 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BATCH_SIZES = [1, 100]
+N_QUERIES = 50
+
+
+def timed(func, *args):
+    """Return (milliseconds, result) of one call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def new_tracks(recommender, rng, prefix, n):
+    """Return n new track dicts copying the features of random tracks."""
+    rows = [rng.randrange(len(recommender.df)) for _ in range(n)]
+    tracks = []
+    for i, row in enumerate(rows):
+        track = {name: recommender.df[name].iloc[row] for name in recommender.feature_columns}
+        track.update(
+            track_id=f'{prefix}-{i}', track_name=f'New Track {prefix} {i}',
+            artists=str(recommender.df['artists'].iloc[row]), genre=str(recommender.df['genre'].iloc[row]),
+            popularity=rng.randrange(100)
+        )
+        tracks.append(track)
+    return tracks
+
+
+def answers(recommender, seeds):
+    """Answer a fixed set of queries as comparable tuples."""
+    results = []
+    for track_id in seeds:
+        for exclude in (False, True):
+            results.append([
+                (track['track_id'], track['similarity_score'])
+                for track in recommender.get_recommendations(track_id, 10, exclude)
+            ])
+    results.append([track['track_id'] for track in recommender.search_tracks('love').slice(0, 50)])
+    results.append([track['track_id'] for track in recommender.autocomplete('new', 20)])
+    return results
+
+
+def query_ms(recommender, seeds):
+    """Return the mean milliseconds of a seed query."""
+    start = time.perf_counter()
+    for track_id in seeds:
+        recommender.get_recommendations(track_id, 10)
+    return (time.perf_counter() - start) * 1000 / len(seeds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental catalog updates.")
+    parser.add_argument('--csv', default=None, help="Dataset CSV (defaults to the loader's)")
+    parser.add_argument('--rounds', type=int, default=20, help="Timed rounds per operation")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    
+    from data import loader
+    if args.csv:
+        loader.FULL_DATASET_PATH = args.csv
+    import recommendation_engine
+    from recommendation_engine import MusicRecommender
+    
+    # Keep updates pending so every round measures the incremental path
+    recommendation_engine.COMPACT_MIN_ROWS = sys.maxsize
+    start = time.perf_counter()
+    recommender = MusicRecommender(cache_size=0, use_neighbor_graph=False)
+    print(f"{len(recommender.df):,} tracks, loaded in {time.perf_counter() - start:.2f}s")
+    rng = random.Random(args.seed)
+    seeds = rng.sample(recommender.df['track_id'].tolist(), N_QUERIES)
+    base_query_ms = query_ms(recommender, seeds)
+    
+    print(f"{'operation':>24} {'mean ms':>10} {'max ms':>10}")
+    for batch_size in BATCH_SIZES:
+        times = [
+            timed(recommender.add_tracks, new_tracks(recommender, rng, f'b{batch_size}r{i}', batch_size))[0]
+            for i in range(args.rounds)
+        ]
+        print(f"{f'add {batch_size} tracks':>24} {np.mean(times):>10.2f} {np.max(times):>10.2f}")
+    times = [
+        timed(recommender.update_tracks, [{'track_id': f'b1r{i}-0', 'popularity': 100}])[0]
+        for i in range(args.rounds)
+    ]
+    print(f"{'update 1 track':>24} {np.mean(times):>10.2f} {np.max(times):>10.2f}")
+    removable = [track_id for track_id in seeds[N_QUERIES // 2:]]
+    times = [timed(recommender.remove_tracks, [track_id])[0] for track_id in removable]
+    print(f"{'remove 1 track':>24} {np.mean(times):>10.2f} {np.max(times):>10.2f}")
+    
+    seeds = seeds[:N_QUERIES // 2]
+    pending = len(recommender.df) - recommender.indexed_rows + recommender.removed_count
+    pending_query_ms = query_ms(recommender, seeds)
+    before = answers(recommender, seeds)
+    compact_ms, _ = timed(recommender.compact)
+    after = answers(recommender, seeds)
+    print(f"{'compact (full rebuild)':>24} {compact_ms:>10.2f}")
+    print(f"Seed query: {base_query_ms:.2f} ms before updates, {pending_query_ms:.2f} ms with "
+          f"{pending} pending, {query_ms(recommender, seeds):.2f} ms after compacting")
+    print(f"Answers with pending updates match compacted answers: {before == after}")
+    sys.exit(0 if before == after else 1)
+
+
+if __name__ == "__main__":
+    main()
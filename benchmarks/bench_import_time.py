@@ -0,0 +1,113 @@
+"""
+Import-time budget check for the serving path.
+
+Imports each serving module in a fresh interpreter with ``python -X
+importtime``, several times, and reports the fastest total plus the
+heaviest direct imports. Fails when a module goes over its budget or
+pulls in a module that should load lazily (scikit-learn, SciPy, plotly,
+the sample data). Also checks that app.py only imports plotly inside the
+chart functions.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--budget-scale 1.0]
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-import budget per module in milliseconds, most of it pandas
+BUDGETS_MS = {
+    'recommendation_engine': 750,
+    'service': 850,
+}
+
+# Modules the serving path must not import
+FORBIDDEN = ['sklearn', 'scipy', 'plotly', 'streamlit', 'threadpoolctl', 'data.sample_data']
+
+N_HEAVIEST = 8
+
+
+def import_times(module):
+    """
+    Import a module in a fresh interpreter.
+    
+    Returns:
+        Tuple of (total microseconds, {direct import: cumulative
+        microseconds}, set of every module imported)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total = 0
+    direct = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        imported.add(name)
+        if name == module and depth == 0:
+            total = int(cumulative)
+        elif depth == 1:
+            direct[name] = int(cumulative)
+    return total, direct, imported
+
+
+def module_level_imports(path):
+    """Return the names imported at the top level of a source file."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.add(node.module)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold import times of the serving path.")
+    parser.add_argument('--runs', type=int, default=5, help="Imports per module (fastest counts)")
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2 on a slow machine")
+    args = parser.parse_args()
+    
+    failures = []
+    for module, budget_ms in BUDGETS_MS.items():
+        runs = [import_times(module) for _ in range(args.runs)]
+        total, direct, imported = min(runs, key=lambda run: run[0])
+        budget_ms *= args.budget_scale
+        print(f"{module}: {total / 1000:.0f} ms (budget {budget_ms:.0f} ms)")
+        for name, cumulative in sorted(direct.items(), key=lambda item: -item[1])[:N_HEAVIEST]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+        if total / 1000 > budget_ms:
+            failures.append(f"{module} took {total / 1000:.0f} ms, over its {budget_ms:.0f} ms budget")
+        for name in FORBIDDEN:
+            if name in imported:
+                failures.append(f"{module} imports {name}")
+    
+    eager = [
+        name for name in module_level_imports(os.path.join(ROOT, 'app.py'))
+        if name.split('.')[0] == 'plotly'
+    ]
+    if eager:
+        failures.append(f"app.py imports {', '.join(sorted(eager))} at module level")
+    
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("All import budgets met")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark for the micro-batching scheduler.
+
+Many threads each run top-k queries against one catalog of unit vectors,
+either scoring on their own or through a MicroBatcher with different batch
+size caps. Reports throughput and per-query latency. Vectors are random
+points in the unit cube (like MinMax-scaled audio features), L2-normalized.
+
+Usage:
+    python benchmarks/bench_micro_batch.py [n_rows] [n_threads]
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from micro_batch import MicroBatcher
+from recommendation_engine import select_top_k
+
+N_DIMS = 9
+K = 10
+QUERIES_PER_THREAD = 20
+BATCH_SIZES = [1, 4, 8, 16, 32, 64]
+MAX_WAIT_MS = 2.0
+
+
+def run(n_threads, queries, query):
+    """Run query() from n_threads threads and return (seconds, latencies)."""
+    latencies = []
+    lock = threading.Lock()
+    
+    def worker(thread):
+        own = []
+        for vector in queries[thread::n_threads]:
+            start = time.perf_counter()
+            query(vector)
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, np.array(latencies) * 1000
+
+
+def report(label, elapsed, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:>12} {len(latencies) / elapsed:>10.0f} q/s {p50:>9.2f} {p99:>9.2f}")
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    rng = np.random.default_rng(42)
+    vectors = rng.random((n_rows, N_DIMS), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(n_rows, n_threads * QUERIES_PER_THREAD)]
+    
+    def score(batch):
+        return np.atleast_2d(batch) @ vectors.T
+    
+    print(f"{n_rows:,} rows, {n_threads} threads, max wait {MAX_WAIT_MS} ms")
+    print(f"{'':>12} {'throughput':>14} {'p50 ms':>9} {'p99 ms':>9}")
+    
+    elapsed, latencies = run(
+        n_threads, queries, lambda vector: select_top_k(score(vector)[0], K)
+    )
+    report('unbatched', elapsed, latencies)
+    
+    for batch_size in BATCH_SIZES:
+        batcher = MicroBatcher(score, batch_size, MAX_WAIT_MS)
+        elapsed, latencies = run(
+            n_threads, queries, lambda vector: select_top_k(batcher.score(vector), K)
+        )
+        stats = batcher.stats()
+        report(f"batch <= {batch_size}", elapsed, latencies)
+        print(f"{'':>12} mean batch size {stats['mean_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
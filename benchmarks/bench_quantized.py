@@ -0,0 +1,101 @@
+"""
+Benchmark for the quantized first-pass scan with exact re-ranking.
+
+Reports recall@k against exact search and per-query latency for several
+numbers of re-ranked candidates. Vectors are random points in the unit
+cube (like MinMax-scaled audio features), L2-normalized.
+
+Exits with status 1 when recall@k with the default number of candidates is
+below --min-recall. With --csv, the recommender's quantized search over
+that dataset (see MusicRecommender.measure_ann_recall) must reach it too.
+
+Usage:
+    python benchmarks/bench_quantized.py [n_rows] [--min-recall 0.99] [--csv path]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantized_index import QuantizedIndex, DEFAULT_CANDIDATES
+from recommendation_engine import select_top_k
+
+N_DIMS = 9
+K = 10
+N_QUERIES = 200
+CANDIDATES = [32, 64, 128, 256, 512, 1024]
+
+# Lowest acceptable recall@K with DEFAULT_CANDIDATES
+MIN_RECALL = 0.99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the quantized scan.")
+    parser.add_argument('n_rows', type=int, nargs='?', default=1_000_000, help="Random vectors")
+    parser.add_argument('--min-recall', type=float, default=MIN_RECALL,
+                        help=f"Lowest acceptable recall@{K} with {DEFAULT_CANDIDATES} candidates")
+    parser.add_argument('--csv', default=None,
+                        help="Also check the recommender's quantized search on this dataset")
+    args = parser.parse_args()
+    
+    n_rows = args.n_rows
+    rng = np.random.default_rng(42)
+    vectors = rng.random((n_rows, N_DIMS), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(n_rows, N_QUERIES, replace=False)]
+    
+    start = time.perf_counter()
+    index = QuantizedIndex(vectors)
+    print(f"Quantized {n_rows:,} rows in {time.perf_counter() - start:.2f}s "
+          f"({index.codes.nbytes / 2**20:.1f} MiB codes vs "
+          f"{vectors.nbytes / 2**20:.1f} MiB float32)")
+    
+    start = time.perf_counter()
+    exact = [select_top_k(vectors @ query, K) for query in queries]
+    exact_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+    print(f"{'exact':>11} {'recall@' + str(K):>10} {1.0:>10.3f} {exact_ms:>10.3f} ms")
+    
+    start = time.perf_counter()
+    for query in queries:
+        index.scan(query)
+    scan_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+    print(f"{'scan only':>11} {'':>10} {'':>10} {scan_ms:>10.3f} ms")
+    
+    recalls = {}
+    for n_candidates in sorted(set(CANDIDATES) | {DEFAULT_CANDIDATES}):
+        index.n_candidates = n_candidates
+        hits = 0
+        start = time.perf_counter()
+        for query, truth in zip(queries, exact):
+            positions, scores = index.search(query)
+            found = positions[select_top_k(scores, K)]
+            hits += len(np.intersect1d(truth, found))
+        elapsed_ms = (time.perf_counter() - start) / N_QUERIES * 1000
+        recalls[n_candidates] = hits / (N_QUERIES * K)
+        print(f"{'rerank ' + str(n_candidates):>11} {'recall@' + str(K):>10} "
+              f"{recalls[n_candidates]:>10.3f} {elapsed_ms:>10.3f} ms")
+    
+    checks = {'random vectors': recalls[DEFAULT_CANDIDATES]}
+    if args.csv:
+        from data import loader
+        loader.FULL_DATASET_PATH = args.csv
+        from recommendation_engine import MusicRecommender
+        recommender = MusicRecommender(search='quantized', cache_size=0, use_neighbor_graph=False)
+        checks[args.csv] = recommender.measure_ann_recall(K, N_QUERIES)
+    
+    ok = True
+    for name, recall in checks.items():
+        passed = recall >= args.min_recall
+        ok &= passed
+        print(f"recall@{K} with {DEFAULT_CANDIDATES} candidates on {name}: {recall:.3f} "
+              f"({'OK' if passed else f'below {args.min_recall}'})")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
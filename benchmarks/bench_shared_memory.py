@@ -0,0 +1,122 @@
+"""
+Check that worker processes share the memory-mapped feature matrix.
+
+Spawns several fresh processes that each build a MusicRecommender, then
+read every byte of the scaled and unit feature matrices and the numeric
+columns, and report a digest of the data plus how much private (anonymous)
+and file-backed memory each step gained. Building the indexes allocates
+private memory of its own, so it is reported separately.
+
+Exits with status 1 unless all digests match, every one of those arrays is
+memory-mapped, and reading them grew no worker's private memory by more
+than --max-private-mb.
+
+Usage:
+    python benchmarks/bench_shared_memory.py [--workers 4] [--csv path]
+        [--max-private-mb 1]
+"""
+
+import argparse
+import hashlib
+import mmap
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Private growth allowed while reading the shared arrays, for interpreter
+# and hashing overhead
+DEFAULT_MAX_PRIVATE_MB = 1.0
+
+
+def memory_kb():
+    """Return (private anonymous, file-backed) resident memory in kB (Linux)."""
+    usage = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('RssAnon:', 'RssFile:')):
+                key, value = line.split(':')
+                usage[key] = int(value.split()[0])
+    return usage['RssAnon'], usage['RssFile']
+
+
+def is_mapped(array):
+    """Return whether an array's memory belongs to a memory-mapped file."""
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def worker(csv_path):
+    """Build a recommender and report a data digest and memory growth."""
+    import numpy as np
+    from data import loader
+    if csv_path:
+        loader.FULL_DATASET_PATH = csv_path
+    from recommendation_engine import MusicRecommender
+    
+    anon_start, _ = memory_kb()
+    recommender = MusicRecommender(use_neighbor_graph=False)
+    numeric = recommender.df.select_dtypes('number')
+    arrays = [recommender.scaled_features, recommender.unit_features] + [
+        numeric[column].to_numpy() for column in numeric.columns
+    ]
+    anon_before, file_before = memory_kb()
+    
+    # Hashing reads the arrays in place (ravel in memory order is a view):
+    # copying them would be private memory
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(memoryview(np.ravel(array, order='K')).cast('B'))
+    anon_after, file_after = memory_kb()
+    
+    return {
+        'pid': os.getpid(),
+        'digest': digest.hexdigest(),
+        'memmapped': all(is_mapped(array) for array in arrays),
+        'mapped_mb': sum(array.nbytes for array in arrays) / 2**20,
+        'build_anon_kb': anon_before - anon_start,
+        'anon_kb': anon_after - anon_before,
+        'file_kb': file_after - file_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--csv', default=None, help="Dataset CSV (defaults to data/spotify_full.csv)")
+    parser.add_argument('--max-private-mb', type=float, default=DEFAULT_MAX_PRIVATE_MB,
+                        help="Private growth allowed per worker while reading the shared arrays")
+    args = parser.parse_args()
+    
+    # Warm the on-disk cache once so every worker maps the same files
+    worker(args.csv)
+    
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(args.workers) as pool:
+        results = pool.map(worker, [args.csv] * args.workers)
+    
+    print(f"Shared arrays: {results[0]['mapped_mb']:.1f} MB per worker")
+    for result in results:
+        print(f"pid {result['pid']}: digest {result['digest'][:12]} "
+              f"memmapped={result['memmapped']} "
+              f"building private +{result['build_anon_kb'] / 1024:.1f} MB; "
+              f"reading the arrays private +{result['anon_kb'] / 1024:.1f} MB, "
+              f"shared file-backed +{result['file_kb'] / 1024:.1f} MB")
+    
+    identical = len({result['digest'] for result in results}) == 1
+    print("All workers see identical data" if identical else "Workers DISAGREE on data")
+    mapped = all(result['memmapped'] for result in results)
+    if not mapped:
+        print("Some shared arrays are NOT memory-mapped")
+    shared = all(result['anon_kb'] <= args.max_private_mb * 1024 for result in results)
+    print(f"Private growth while reading is within {args.max_private_mb} MB" if shared
+          else f"Private growth while reading EXCEEDS {args.max_private_mb} MB")
+    sys.exit(0 if identical and mapped and shared else 1)
+
+
+if __name__ == "__main__":
+    main()
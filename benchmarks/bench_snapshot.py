@@ -0,0 +1,109 @@
+"""
+Benchmark for recommender snapshots.
+
+Times preparing a recommender from the CSV alone and from the dataset's
+binary cache against restoring a snapshot with and without checksum
+verification. Preparing includes building the autocomplete index, which a
+snapshot holds. Also checks that the restored recommender answers a fixed
+set of queries exactly like the one it was saved from.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--csv path] [--search exact] [--low-memory]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_QUERIES = 50
+
+
+def answers(recommender, seeds):
+    """Answer a fixed set of queries as comparable tuples."""
+    results = []
+    for track_id in seeds:
+        for exclude in (False, True):
+            results.append([
+                (track['track_id'], track['similarity_score'])
+                for track in recommender.get_recommendations(track_id, 10, exclude)
+            ])
+    for mood in recommender.MOOD_PRESETS:
+        results.append([track['track_id'] for track in recommender.get_mood_based_recommendations(mood)])
+    for query in ('love', 'the', 'a'):
+        results.append([track['track_id'] for track in recommender.search_tracks(query).slice(0, 50)])
+        results.append([track['track_id'] for track in recommender.autocomplete(query, 20)])
+    results.append(recommender.get_genre_counts())
+    return results
+
+
+def directory_bytes(path):
+    """Return the total size of the files under a directory."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark saving and restoring snapshots.")
+    parser.add_argument('--csv', default=None, help="Dataset CSV (defaults to the loader's)")
+    parser.add_argument('--search', default='exact', choices=['exact', 'ann', 'quantized'])
+    parser.add_argument('--low-memory', action='store_true', help="Use the compact catalog")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    
+    from data import loader
+    if args.csv:
+        loader.FULL_DATASET_PATH = args.csv
+    from recommendation_engine import MusicRecommender
+    options = {'search': args.search, 'low_memory': args.low_memory, 'cache_size': 0}
+    
+    def prepare():
+        loader._cached_df = loader._cached_compact_df = None
+        return MusicRecommender(**options)
+    
+    # The first build writes the binary cache the second one reads
+    start = time.perf_counter()
+    prepare()
+    csv_s = time.perf_counter() - start
+    start = time.perf_counter()
+    recommender = prepare()
+    cache_s = time.perf_counter() - start
+    
+    rng = random.Random(args.seed)
+    seeds = rng.sample(recommender.df['track_id'].tolist(), N_QUERIES)
+    expected = answers(recommender, seeds)
+    
+    path = os.path.join(tempfile.mkdtemp(), 'bench.snapshot')
+    try:
+        start = time.perf_counter()
+        recommender.save_snapshot(path)
+        save_s = time.perf_counter() - start
+        timings = {}
+        for verify in (True, False):
+            start = time.perf_counter()
+            restored = MusicRecommender.load_snapshot(path, verify=verify, **options)
+            timings[verify] = time.perf_counter() - start
+        match = answers(restored, seeds) == expected
+        size = directory_bytes(path)
+    finally:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+    
+    print(f"{len(recommender.df):,} tracks, search={args.search}, low_memory={args.low_memory}")
+    print(f"{'prepare from CSV':>28} {csv_s * 1000:>10.1f} ms")
+    print(f"{'prepare from binary cache':>28} {cache_s * 1000:>10.1f} ms")
+    print(f"{'save snapshot':>28} {save_s * 1000:>10.1f} ms ({size / 1e6:.1f} MB)")
+    print(f"{'restore, verified':>28} {timings[True] * 1000:>10.1f} ms")
+    print(f"{'restore, unverified':>28} {timings[False] * 1000:>10.1f} ms")
+    print(f"Restored answers match: {match}")
+    sys.exit(0 if match else 1)
+
+
+if __name__ == "__main__":
+    main()
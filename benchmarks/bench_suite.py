@@ -0,0 +1,310 @@
+"""
+Reproducible benchmark suite over synthetic catalogs.
+
+For every catalog size, a synthetic catalog is generated (see
+data/synthetic_catalog.py) and kept in --work-dir for later runs. Then
+three fresh processes each measure one phase:
+- build: prepare the recommender from the CSV alone (writing the binary
+  cache), build the autocomplete index and save a snapshot
+- restore: restore that snapshot
+- serve: prepare from the binary cache, then time every public query
+  method over random inputs (result cache off, one warm-up call each)
+
+Each phase records its own peak RSS. Results are written to a JSON file
+together with the commit, library versions and machine, so runs can be
+compared across commits with --compare.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10000,100000] [--queries 200]
+        [--output bench.json] [--compare baseline.json] [--low-memory]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+# get_all_tracks builds a dict per track, so larger catalogs skip it
+ALL_TRACKS_MAX_ROWS = 1_000_000
+
+BATCH_SIZE = 32
+
+PERCENTILES = [50, 95, 99]
+
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed_ms(func):
+    """Return the milliseconds one call takes."""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def latency_summary(times):
+    """Summarize call latencies in milliseconds."""
+    times = np.asarray(times)
+    summary = {'calls': len(times), 'mean_ms': float(times.mean())}
+    for percentile, value in zip(PERCENTILES, np.percentile(times, PERCENTILES)):
+        summary[f'p{percentile}_ms'] = float(value)
+    summary['max_ms'] = float(times.max())
+    return summary
+
+
+def operations(recommender, rng, n_queries):
+    """
+    Return the operations to time, covering every public query method.
+    
+    Returns:
+        List of (name, number of calls, function of a call index)
+    """
+    from artist_index import split_credit
+    
+    df = recommender.df
+    track_ids = df['track_id'].tolist()
+    seeds = [rng.choice(track_ids) for _ in range(n_queries)]
+    genres = recommender.get_all_genres()
+    rows = [rng.randrange(len(df)) for _ in range(n_queries)]
+    names = df['track_name'].values[rows].tolist()
+    artists = [split_credit(credit)[0] for credit in df['artists'].values[rows].tolist()]
+    words = [max(name.split(), key=len) for name in names]
+    prefixes = [name[:rng.randint(1, 6)] for name in names]
+    features = [
+        {name: rng.random() for name in ('danceability', 'energy', 'valence', 'acousticness')}
+        for _ in range(n_queries)
+    ]
+    moods = list(recommender.MOOD_PRESETS)
+    few = max(n_queries // 10, 3)
+    
+    ops = [
+        ('get_recommendations', n_queries, lambda i: recommender.get_recommendations(seeds[i], 10)),
+        ('get_recommendations_exclude_artist', n_queries,
+         lambda i: recommender.get_recommendations(seeds[i], 10, exclude_same_artist=True)),
+        ('get_recommendations_same_artist', n_queries,
+         lambda i: recommender.get_recommendations(seeds[i], 10, same_artist_only=True)),
+        ('get_recommendations_batch', few, lambda i: recommender.get_recommendations_batch(
+            [seeds[(i * BATCH_SIZE + j) % n_queries] for j in range(BATCH_SIZE)], 10
+        )),
+        ('get_recommendations_by_features', n_queries,
+         lambda i: recommender.get_recommendations_by_features(features[i], 10)),
+        ('get_mood_based_recommendations', n_queries,
+         lambda i: recommender.get_mood_based_recommendations(moods[i % len(moods)], 10)),
+        ('get_mood_based_recommendations_deep', few,
+         lambda i: recommender.get_mood_based_recommendations(moods[i % len(moods)], 100)),
+        ('search_tracks', n_queries, lambda i: recommender.search_tracks(words[i]).slice(0, 50)),
+        ('autocomplete', n_queries, lambda i: recommender.autocomplete(prefixes[i], 20)),
+        ('browse_genre', n_queries,
+         lambda i: recommender.browse_genre(genres[i % len(genres)]).slice(0, 50)),
+        ('get_tracks_by_genre', n_queries,
+         lambda i: recommender.get_tracks_by_genre(genres[i % len(genres)])),
+        ('browse_artist', n_queries, lambda i: recommender.browse_artist(artists[i]).slice(0, 50)),
+        ('get_track_by_id', n_queries, lambda i: recommender.get_track_by_id(seeds[i])),
+        ('get_track_features', n_queries, lambda i: recommender.get_track_features(seeds[i])),
+        ('get_popular_tracks', few, lambda i: recommender.get_popular_tracks(200)),
+        ('get_genre_stats', few, lambda i: recommender.get_genre_stats()),
+        ('get_genre_counts', few, lambda i: recommender.get_genre_counts()),
+        ('get_all_genres', few, lambda i: recommender.get_all_genres()),
+    ]
+    if len(df) <= ALL_TRACKS_MAX_ROWS:
+        ops.append(('get_all_tracks', 3, lambda i: recommender.get_all_tracks()))
+    return ops
+
+
+def run_phase(args):
+    """Run one phase in this process and return its measurements."""
+    from data import loader
+    loader.FULL_DATASET_PATH = args.csv
+    from recommendation_engine import MusicRecommender
+    from snapshot import default_snapshot_path
+    
+    options = {
+        'search': args.search, 'low_memory': args.low_memory,
+        'cache_size': 0, 'use_neighbor_graph': False
+    }
+    result = {}
+    if args.phase == 'build':
+        shutil.rmtree(loader.get_cache_dir(), ignore_errors=True)
+        start = time.perf_counter()
+        recommender = MusicRecommender(**options)
+        result['prepare_from_csv_ms'] = (time.perf_counter() - start) * 1000
+        result['autocomplete_index_ms'] = timed_ms(lambda: recommender.autocomplete('a'))
+        result['save_snapshot_ms'] = timed_ms(
+            lambda: recommender.save_snapshot(default_snapshot_path())
+        )
+        result['rows'] = len(recommender.df)
+    elif args.phase == 'restore':
+        result['restore_snapshot_ms'] = timed_ms(
+            lambda: MusicRecommender.load_snapshot(default_snapshot_path(), **options)
+        )
+    else:
+        start = time.perf_counter()
+        recommender = MusicRecommender(**options)
+        result['prepare_from_cache_ms'] = (time.perf_counter() - start) * 1000
+        rng = random.Random(args.seed)
+        result['operations'] = {}
+        for name, n_calls, call in operations(recommender, rng, args.queries):
+            first_ms = timed_ms(lambda: call(0))
+            summary = latency_summary([timed_ms(lambda: call(i)) for i in range(n_calls)])
+            summary['first_ms'] = first_ms
+            result['operations'][name] = summary
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def benchmark_size(n_rows, args):
+    """Generate (or reuse) a catalog and run every phase on it in fresh processes."""
+    from data.synthetic_catalog import GENERATOR_VERSION, write_catalog
+    
+    os.makedirs(args.work_dir, exist_ok=True)
+    csv_path = os.path.join(
+        args.work_dir, f"synthetic_{n_rows}_seed{args.seed}_v{GENERATOR_VERSION}.csv"
+    )
+    if not os.path.exists(csv_path):
+        print(f"Generating {n_rows:,} tracks in {csv_path}", flush=True)
+        write_catalog(csv_path, n_rows, args.seed)
+    
+    result = {'catalog_rows': n_rows, 'load': {}, 'peak_rss_mb': {}}
+    for phase in ('build', 'restore', 'serve'):
+        command = [
+            sys.executable, os.path.abspath(__file__), '--phase', phase, '--csv', csv_path,
+            '--queries', str(args.queries), '--seed', str(args.seed), '--search', args.search
+        ]
+        if args.low_memory:
+            command.append('--low-memory')
+        output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        if output.returncode:
+            raise RuntimeError(f"{phase} phase failed for {n_rows:,} rows:\n{output.stderr}")
+        measured = json.loads(output.stdout)
+        result['peak_rss_mb'][phase] = measured.pop('peak_rss_mb')
+        result['rows'] = measured.pop('rows', result.get('rows'))
+        if 'operations' in measured:
+            result['operations'] = measured.pop('operations')
+        result['load'].update(measured)
+    return result
+
+
+def environment():
+    """Describe the commit and machine a run measured."""
+    def git(*git_args):
+        try:
+            return subprocess.run(
+                ['git', *git_args], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    
+    import pandas as pd
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def print_results(results):
+    """Print load times, memory and median/p99 latency per size."""
+    for result in results:
+        load = result['load']
+        print(f"\n{result['rows']:,} tracks: from CSV {load['prepare_from_csv_ms']:.0f} ms, "
+              f"from cache {load['prepare_from_cache_ms']:.0f} ms, "
+              f"snapshot restore {load['restore_snapshot_ms']:.0f} ms")
+        print("Peak RSS: " + ", ".join(
+            f"{phase} {mb:.0f} MB" for phase, mb in result['peak_rss_mb'].items() if mb is not None
+        ))
+        print(f"{'operation':>36} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'first ms':>9}")
+        for name, summary in result['operations'].items():
+            print(f"{name:>36} {summary['calls']:>6} {summary['p50_ms']:>9.3f} "
+                  f"{summary['p95_ms']:>9.3f} {summary['p99_ms']:>9.3f} {summary['first_ms']:>9.3f}")
+
+
+def print_comparison(results, options, baseline):
+    """Print the p50 and p99 ratio of every operation against a baseline run."""
+    print(f"\nCompared with {baseline['environment'].get('commit')} (ratio > 1 is slower now)")
+    if baseline.get('options') != options:
+        print(f"Note: the baseline ran with {baseline.get('options')}, this run with {options}")
+    previous = {result['catalog_rows']: result for result in baseline['results']}
+    for result in results:
+        before = previous.get(result['catalog_rows'])
+        if before is None:
+            continue
+        print(f"{result['catalog_rows']:,} tracks")
+        pairs = [
+            (f'load {name}', value, before['load'].get(name))
+            for name, value in result['load'].items()
+        ] + [
+            (f'{name} {stat}', summary[stat], before['operations'].get(name, {}).get(stat))
+            for name, summary in result['operations'].items()
+            for stat in ('p50_ms', 'p99_ms')
+        ]
+        for label, now, then in pairs:
+            if then:
+                print(f"{label:>44} {then:>10.3f} -> {now:>10.3f} ms  x{now / then:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recommender on synthetic catalogs.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated catalog sizes, e.g. 10000,100000,1000000,10000000")
+    parser.add_argument('--queries', type=int, default=200, help="Calls per query operation")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for catalogs and queries")
+    parser.add_argument('--search', default='exact', choices=['exact', 'ann', 'quantized'])
+    parser.add_argument('--low-memory', action='store_true', help="Use the compact catalog")
+    parser.add_argument('--work-dir', default=os.path.join(tempfile.gettempdir(), 'recommender-bench'),
+                        help="Where generated catalogs are kept between runs")
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    parser.add_argument('--compare', default=None, help="Earlier JSON output to compare with")
+    parser.add_argument('--phase', choices=['build', 'restore', 'serve'], help=argparse.SUPPRESS)
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.phase:
+        print(json.dumps(run_phase(args)))
+        return
+    
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = [benchmark_size(n_rows, args) for n_rows in sizes]
+    options = {
+        'queries': args.queries, 'seed': args.seed,
+        'search': args.search, 'low_memory': args.low_memory
+    }
+    report = {'environment': environment(), 'options': options, 'results': results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, options, json.load(f))
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
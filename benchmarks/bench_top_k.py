@@ -0,0 +1,50 @@
+"""
+Benchmark for top-k selection over a similarity vector.
+
+Compares the full ``np.argsort`` ranking the recommender used to do with
+``select_top_k`` (partial partition plus a small sort).
+
+Usage:
+    python benchmarks/bench_top_k.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendation_engine import select_top_k
+
+SIZES = [100_000, 1_000_000, 5_000_000]
+K_VALUES = [10, 20]
+REPEATS = 5
+
+
+def time_per_query(func, scores, repeats=REPEATS):
+    """Return the best wall time in milliseconds over several runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        buffer = scores.copy()
+        start = time.perf_counter()
+        func(buffer)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'rows':>10} {'k':>4} {'argsort ms':>12} {'top-k ms':>10} {'speedup':>8}")
+    for n_rows in SIZES:
+        scores = rng.random(n_rows)
+        for k in K_VALUES:
+            full_sort = time_per_query(lambda s: np.argsort(s)[::-1][:k], scores)
+            partial = time_per_query(lambda s: select_top_k(s, k), scores)
+            print(f"{n_rows:>10,} {k:>4} {full_sort:>12.2f} {partial:>10.2f} "
+                  f"{full_sort / partial:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Check that recommendations match the original cosine similarity ranking.
+
+The recommender scores float32 (or float64) unit vectors instead of calling
+scikit-learn's cosine_similarity on the scaled float64 features as it first
+did. This script recomputes that original ranking for random seed tracks
+and feature presets and compares it with get_recommendations and
+get_recommendations_by_features in both dtypes. Without scikit-learn, the
+reference is the same computation in float64 NumPy.
+
+A result passes when every returned track's reference similarity equals
+the reference top-k similarity at its rank within the dtype's tolerance,
+so only near-ties may swap places, and every displayed score is the
+reference score rounded as before (up to the same tolerance).
+
+get_recommendations scores a seed with a matrix-vector product and
+get_recommendations_batch with a matrix-matrix product, which BLAS may
+round differently. Both must pass the comparison, so they return the same
+ranking with the same displayed scores, except that near-ties may swap
+and a score within the tolerance of a rounding boundary may round either
+way.
+
+Exits with status 1 on any mismatch.
+
+Usage:
+    python benchmarks/check_rankings.py [--csv path | --rows 20000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Largest similarity error each dtype may show against the float64 reference
+TOLERANCE = {'float32': 1e-5, 'float64': 1e-9}
+
+K_VALUES = [10, 50]
+
+
+def reference_similarities(features):
+    """
+    Return a function scoring a raw feature vector the original way.
+    
+    Features are min-max scaled over the catalog and compared with
+    cosine_similarity in float64.
+    """
+    try:
+        from sklearn.metrics.pairwise import cosine_similarity
+        from sklearn.preprocessing import MinMaxScaler
+    except ImportError:
+        lower, upper = features.min(axis=0), features.max(axis=0)
+        span = np.where(upper > lower, upper - lower, 1.0)
+        scaled = (features - lower) / span
+        norms = np.linalg.norm(scaled, axis=1)
+        norms[norms == 0] = 1
+        unit = scaled / norms[:, None]
+        
+        def similarities(vector):
+            query = (np.asarray(vector, dtype=np.float64) - lower) / span
+            norm = np.linalg.norm(query)
+            return unit @ (query / (norm if norm else 1))
+        return similarities, 'NumPy float64'
+    
+    scaler = MinMaxScaler()
+    scaled = scaler.fit_transform(features)
+    
+    def similarities(vector):
+        return cosine_similarity(scaler.transform(np.atleast_2d(vector)), scaled)[0]
+    return similarities, 'scikit-learn cosine_similarity'
+
+
+def compare(recommender, recommendations, similarities, n, tolerance):
+    """
+    Compare recommendations with the reference similarities of every row.
+    
+    Rows that may not be recommended must already be at -inf.
+    
+    Returns:
+        None when they match, else a description of the first difference
+    """
+    expected = np.sort(similarities)[::-1][:n]
+    expected = expected[np.isfinite(expected)]
+    if len(recommendations) != len(expected):
+        return f"{len(recommendations)} results, expected {len(expected)}"
+    for rank, (track, best) in enumerate(zip(recommendations, expected)):
+        row = recommender.lookup(track['track_id'])
+        actual = similarities[row]
+        if not abs(actual - best) <= tolerance:
+            return (f"rank {rank}: {track['track_id']} has similarity {actual:.9f}, "
+                    f"expected {best:.9f}")
+        displayed = {round((best + delta) * 100, 1) for delta in (-tolerance, 0, tolerance)}
+        if track['similarity_score'] not in displayed:
+            return (f"rank {rank}: score {track['similarity_score']}, "
+                    f"expected {round(best * 100, 1)}")
+    return None
+
+
+def check(dtype, features, similarities, args):
+    """Compare one dtype's rankings with the reference; return the mismatches."""
+    from recommendation_engine import MusicRecommender
+    
+    recommender = MusicRecommender(dtype=dtype, cache_size=0, use_neighbor_graph=False)
+    tolerance = TOLERANCE[dtype]
+    rng = random.Random(args.seed)
+    artists = recommender.df['artists'].to_numpy()
+    track_ids = recommender.df['track_id'].to_numpy()
+    seeds = rng.sample(range(len(features)), args.queries)
+    batches = {
+        (exclude_same_artist, n): recommender.get_recommendations_batch(
+            track_ids[seeds], n, exclude_same_artist, columns=['track_id']
+        )
+        for exclude_same_artist in (False, True) for n in K_VALUES
+    }
+    failures = []
+    
+    for slot, idx in enumerate(seeds):
+        scores = similarities(features[idx])
+        for exclude_same_artist in (False, True):
+            masked = scores.copy()
+            masked[idx] = -np.inf
+            if exclude_same_artist:
+                masked[artists == artists[idx]] = -np.inf
+            for n in K_VALUES:
+                recommendations = recommender.get_recommendations(
+                    track_ids[idx], n, exclude_same_artist, columns=['track_id']
+                )
+                batch = batches[exclude_same_artist, n][slot]
+                error = compare(recommender, recommendations, masked, n, tolerance)
+                if not error:
+                    error = compare(recommender, batch, masked, n, tolerance)
+                    error = error and f"batch {error}"
+                if error:
+                    failures.append(f"seed {track_ids[idx]} n={n} "
+                                    f"exclude_same_artist={exclude_same_artist}: {error}")
+    
+    for _ in range(args.queries):
+        preset = {
+            'danceability': rng.random(), 'energy': rng.random(),
+            'loudness': rng.uniform(-40, 0), 'speechiness': rng.random() / 2,
+            'acousticness': rng.random(), 'instrumentalness': rng.random(),
+            'liveness': rng.random() / 2, 'valence': rng.random(),
+            'tempo': rng.uniform(60, 200)
+        }
+        vector = recommender._preset_vector(preset)[0]
+        for n in K_VALUES:
+            recommendations = recommender.get_recommendations_by_features(
+                preset, n, columns=['track_id']
+            )
+            error = compare(recommender, recommendations, similarities(vector), n, tolerance)
+            if error:
+                failures.append(f"features {preset} n={n}: {error}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check rankings against cosine_similarity.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--csv', default=None, help="Dataset CSV (defaults to the loader's)")
+    source.add_argument('--rows', type=int, default=None,
+                        help="Check a synthetic catalog of this many tracks instead")
+    parser.add_argument('--queries', type=int, default=200, help="Seeds and presets per dtype")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    
+    from data import loader
+    work_dir = None
+    if args.rows:
+        from data.synthetic_catalog import write_catalog
+        work_dir = tempfile.mkdtemp()
+        args.csv = write_catalog(os.path.join(work_dir, 'catalog.csv'), args.rows, args.seed)
+    if args.csv:
+        loader.FULL_DATASET_PATH = args.csv
+    
+    try:
+        features = loader.load_full_dataset()[loader.get_audio_features_columns()].to_numpy(
+            dtype=np.float64
+        )
+        similarities, reference = reference_similarities(features)
+        print(f"{len(features):,} tracks, reference: {reference}")
+        ok = True
+        for dtype in TOLERANCE:
+            failures = check(dtype, features, similarities, args)
+            for failure in failures[:10]:
+                print(f"  {failure}")
+            print(f"{dtype}: {'OK' if not failures else f'{len(failures)} mismatches'}")
+            ok &= not failures
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Load test for the JSON HTTP service (service.py).
+
+Opens a number of keep-alive connections and sends a mix of search,
+by-song, by-features, mood and genre requests as fast as the service
+answers them. Reports throughput, errors and latency percentiles per
+endpoint. Apart from NumPy for the percentiles it only uses the standard
+library.
+
+Start the service first, then run:
+    python service.py --port 8000
+    python benchmarks/load_test.py --port 8000 --concurrency 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+SEARCH_QUERIES = ['love', 'the', 'a', 'night', 'baby', 'dance', 'rock', 'me']
+
+
+async def request(reader, writer, method, path, body=None):
+    """Send one request on a keep-alive connection and return (status, JSON)."""
+    data = json.dumps(body).encode('utf-8') if body is not None else b''
+    head = (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n")
+    writer.write(head.encode('latin-1') + data)
+    await writer.drain()
+    
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def make_requests(track_ids, genres, moods, rng):
+    """Return an endless generator of (endpoint, method, path, body) tuples."""
+    while True:
+        kind = rng.choice(['search', 'song', 'features', 'mood', 'genre'])
+        if kind == 'search':
+            path = f"/search?q={quote(rng.choice(SEARCH_QUERIES))}&page={rng.randrange(3)}"
+            yield kind, 'GET', path, None
+        elif kind == 'song':
+            path = (f"/tracks/{quote(rng.choice(track_ids))}/recommendations"
+                    f"?n={rng.randrange(5, 21)}&exclude_same_artist={rng.choice(['true', 'false'])}")
+            yield kind, 'GET', path, None
+        elif kind == 'features':
+            features = {
+                name: round(rng.random(), 2)
+                for name in ('danceability', 'energy', 'valence', 'acousticness')
+            }
+            yield kind, 'POST', '/recommendations/features', {'features': features, 'n': 10}
+        elif kind == 'mood':
+            yield kind, 'GET', f"/moods/{rng.choice(moods)}?n={rng.randrange(5, 21)}", None
+        else:
+            yield kind, 'GET', f"/genres/{quote(rng.choice(genres))}?page={rng.randrange(5)}", None
+
+
+async def worker(host, port, deadline, requests, latencies, errors):
+    """Send requests on one connection until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind, method, path, body = next(requests)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body)
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+            if status != 200:
+                errors[kind] = errors.get(kind, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, search = await request(reader, writer, 'GET', '/search?q=e&page_size=100')
+    _, genres = await request(reader, writer, 'GET', '/genres')
+    _, moods = await request(reader, writer, 'GET', '/moods')
+    writer.close()
+    
+    rng = random.Random(args.seed)
+    requests = make_requests(
+        [track['track_id'] for track in search['tracks']],
+        [genre['genre'] for genre in genres['genres']],
+        moods['moods'],
+        rng
+    )
+    latencies = {}
+    errors = {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        worker(args.host, args.port, deadline, requests, latencies, errors)
+        for _ in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total:,} requests in {elapsed:.1f}s over {args.concurrency} connections: "
+          f"{total / elapsed:,.0f} req/s, {sum(errors.values())} errors")
+    print(f"{'endpoint':>10} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    everything = []
+    for kind in sorted(latencies):
+        values = np.array(latencies[kind]) * 1000
+        everything.append(values)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{kind:>10} {len(values):>8} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f}")
+    if everything:
+        p50, p95, p99 = np.percentile(np.concatenate(everything), [50, 95, 99])
+        print(f"{'all':>10} {total:>8} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the recommender HTTP service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=16, help="Open connections")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds to run")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the request mix")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
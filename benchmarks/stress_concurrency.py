@@ -0,0 +1,120 @@
+"""
+Concurrency stress test for a shared MusicRecommender.
+
+Computes a reference answer for a set of distinct queries serially, then
+fires thousands of those queries at one recommender from many threads and
+checks that every concurrent answer equals its reference. Queries mix
+seed-track, feature, mood, search and autocomplete requests. Exits with
+status 1 on any mismatch or error.
+
+Usage:
+    python benchmarks/stress_concurrency.py [--threads 32] [--queries 5000]
+        [--micro-batch] [--blas-threads 1] [--cache-size 0] [--csv path]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_DISTINCT = 500
+FEATURES = ['danceability', 'energy', 'valence', 'acousticness', 'instrumentalness']
+PREFIXES = ['a', 'lo', 'love', 'the', 'b', 'song', 'mi']
+
+
+def make_queries(recommender, rng):
+    """Return N_DISTINCT distinct (kind, args) queries."""
+    track_ids = recommender.df['track_id'].tolist()
+    moods = sorted(recommender.MOOD_PRESETS)
+    queries = set()
+    while len(queries) < N_DISTINCT:
+        kind = rng.choice(['seed', 'features', 'mood', 'search', 'autocomplete'])
+        if kind == 'seed':
+            args = (rng.choice(track_ids), rng.randrange(5, 21), rng.random() < 0.5)
+        elif kind == 'features':
+            args = (tuple((name, round(rng.random(), 2)) for name in FEATURES), rng.randrange(5, 21))
+        elif kind == 'mood':
+            args = (rng.choice(moods), rng.randrange(5, 61))
+        elif kind == 'search':
+            args = (rng.choice(PREFIXES), rng.randrange(3))
+        else:
+            args = (rng.choice(PREFIXES),)
+        queries.add((kind, args))
+    return sorted(queries)
+
+
+def run_query(recommender, query):
+    """Answer one query."""
+    kind, args = query
+    if kind == 'seed':
+        track_id, n, exclude = args
+        return recommender.get_recommendations(track_id, n, exclude_same_artist=exclude)
+    if kind == 'features':
+        features, n = args
+        return recommender.get_recommendations_by_features(dict(features), n)
+    if kind == 'mood':
+        return recommender.get_mood_based_recommendations(*args)
+    if kind == 'search':
+        text, page = args
+        return recommender.search_tracks(text).page(page)
+    return recommender.autocomplete(args[0], 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress a shared recommender from many threads.")
+    parser.add_argument('--threads', type=int, default=32, help="Concurrent threads")
+    parser.add_argument('--queries', type=int, default=5000, help="Concurrent queries to run")
+    parser.add_argument('--micro-batch', action='store_true', help="Enable micro-batching")
+    parser.add_argument('--blas-threads', type=int, default=1, help="BLAS threads per product")
+    parser.add_argument('--cache-size', type=int, default=0, help="Result cache entries")
+    parser.add_argument('--csv', default=None, help="Dataset CSV (defaults to the loader's)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the query mix")
+    args = parser.parse_args()
+    
+    from data import loader
+    if args.csv:
+        loader.FULL_DATASET_PATH = args.csv
+    from recommendation_engine import MusicRecommender
+    
+    recommender = MusicRecommender(
+        cache_size=args.cache_size, micro_batch=args.micro_batch, blas_threads=args.blas_threads
+    )
+    rng = random.Random(args.seed)
+    distinct = make_queries(recommender, rng)
+    
+    start = time.perf_counter()
+    reference = {query: run_query(recommender, query) for query in distinct}
+    serial = time.perf_counter() - start
+    print(f"Reference answers for {len(distinct)} distinct queries in {serial:.2f}s")
+    
+    workload = [rng.choice(distinct) for _ in range(args.queries)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        futures = [executor.submit(run_query, recommender, query) for query in workload]
+        mismatches = 0
+        errors = 0
+        for query, future in zip(workload, futures):
+            try:
+                if future.result() != reference[query]:
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"Mismatch for {query}")
+            except Exception as error:
+                errors += 1
+                if errors <= 5:
+                    print(f"Error for {query}: {type(error).__name__}: {error}")
+    elapsed = time.perf_counter() - start
+    
+    print(f"{len(workload):,} queries on {args.threads} threads in {elapsed:.2f}s "
+          f"({len(workload) / elapsed:,.0f} q/s): {mismatches} mismatches, {errors} errors")
+    if recommender.batcher is not None:
+        print(f"Micro-batcher: {recommender.batcher.stats()}")
+    sys.exit(1 if mismatches or errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Building blocks for updating a live catalog.
+
+AppendBuffer keeps an array with spare rows at the end, so appending a few
+tracks copies only those tracks instead of the whole feature matrix.
+Catalog reads a catalog DataFrame and the tracks appended to it as one
+catalog without copying the DataFrame. ReadWriteLock lets any number of
+queries run together while an update waits for them and then runs alone.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from data.loader import append_tracks
+
+# Spare capacity added when an AppendBuffer grows, as a fraction of its rows
+GROWTH = 0.25
+
+# Smallest number of spare rows added when growing
+MIN_GROWTH_ROWS = 1024
+
+
+def _capacity_for(n_rows):
+    """Return the buffer size for n_rows rows plus spare capacity."""
+    return n_rows + max(int(n_rows * GROWTH), MIN_GROWTH_ROWS)
+
+
+class AppendBuffer:
+    """Rows of an array with room to append more without copying them all."""
+    
+    def __init__(self, array):
+        """
+        Args:
+            array: Initial rows; copied into a private, writeable buffer
+        """
+        array = np.asarray(array)
+        self._data = np.empty((_capacity_for(len(array)),) + array.shape[1:], dtype=array.dtype)
+        self._data[:len(array)] = array
+        self.size = len(array)
+    
+    def append(self, rows):
+        """
+        Append rows, growing the buffer if it is full.
+        
+        Returns:
+            Read-only view of every row
+        """
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        end = self.size + len(rows)
+        if end > len(self._data):
+            data = np.empty((_capacity_for(end),) + self._data.shape[1:], dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:end] = rows
+        self.size = end
+        return self.view()
+    
+    def assign(self, rows, values):
+        """
+        Overwrite rows in place. Views returned before see the change, so
+        no reader may use them meanwhile.
+        """
+        self._data[:self.size][rows] = values
+    
+    def view(self):
+        """Return a read-only view of the rows appended so far."""
+        view = self._data[:self.size]
+        view.setflags(write=False)
+        return view
+
+
+def _appended_values(values, dtype):
+    """
+    Convert new values of a catalog column like append_tracks does.
+    
+    Integers become int64 so a downcast column can widen, text becomes
+    Python strings (categories are added when the catalog is merged) and
+    anything else takes the column's dtype.
+    """
+    if pd.api.types.is_bool_dtype(dtype):
+        return values.to_numpy(dtype=bool)
+    if pd.api.types.is_integer_dtype(dtype):
+        return values.round().to_numpy(dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(dtype):
+        return values.to_numpy(dtype=dtype)
+    return values.astype(str).to_numpy(dtype=object)
+
+
+class Catalog:
+    """
+    A catalog DataFrame and the tracks appended to it, read as one catalog.
+    
+    The DataFrame is never copied or changed, so memory-mapped columns stay
+    mapped. Appended tracks are kept in one AppendBuffer per column, so
+    appending costs as much as the new tracks. A Catalog never changes:
+    append returns a new one sharing the buffers, and results still reading
+    an older one see the rows it had.
+    
+    frame() merges everything into one DataFrame. Compaction and snapshots
+    need that; queries read values_at and column instead.
+    """
+    
+    def __init__(self, base):
+        """
+        Args:
+            base: Catalog DataFrame with a default RangeIndex
+        """
+        self.base = base
+        self.appended = {}
+        self.n_base = len(base)
+        self.n_appended = 0
+        self._buffers = None
+        self._frame = None
+    
+    def __len__(self):
+        return self.n_base + self.n_appended
+    
+    @property
+    def columns(self):
+        """Column names, as in the DataFrame."""
+        return self.base.columns
+    
+    def append(self, tracks):
+        """
+        Return a catalog with prepared tracks (see prepare_tracks) appended.
+        
+        Only the newest catalog may be appended to, since catalogs returned
+        before share its buffers.
+        """
+        buffers = self._buffers
+        if buffers is None:
+            buffers = {
+                name: AppendBuffer(_appended_values(self.base[name].iloc[:0], dtype))
+                for name, dtype in self.base.dtypes.items()
+            }
+        elif any(buffer.size != self.n_appended for buffer in buffers.values()):
+            raise ValueError("Tracks can only be appended to the newest catalog")
+        
+        catalog = Catalog(self.base)
+        catalog._buffers = buffers
+        catalog.appended = {
+            name: buffers[name].append(_appended_values(tracks[name], dtype))
+            for name, dtype in self.base.dtypes.items()
+        }
+        catalog.n_appended = self.n_appended + len(tracks)
+        return catalog
+    
+    def values_at(self, name, rows):
+        """Return the values of a column at row positions, as an array."""
+        rows = np.asarray(rows, dtype=np.intp)
+        values = self.base[name].values
+        if not self.n_appended:
+            return values[rows]
+        is_appended = rows >= self.n_base
+        if not is_appended.any():
+            return values[rows]
+        appended = self.appended[name]
+        if is_appended.all():
+            return appended[rows - self.n_base]
+        base_values = np.asarray(values[rows[~is_appended]])
+        result = np.empty(len(rows), dtype=np.result_type(base_values.dtype, appended.dtype))
+        result[~is_appended] = base_values
+        result[is_appended] = appended[rows[is_appended] - self.n_base]
+        return result
+    
+    def column(self, name):
+        """Return every value of a column, as an array."""
+        values = self.base[name].values
+        if not self.n_appended:
+            return values
+        return np.concatenate([np.asarray(values), self.appended[name]])
+    
+    def appended_column(self, name):
+        """Return a column's values of the appended tracks only, as a Series."""
+        values = self.appended.get(name)
+        if values is None:
+            values = _appended_values(self.base[name].iloc[:0], self.base[name].dtype)
+        return pd.Series(values, copy=False)
+    
+    def frame(self):
+        """Return the whole catalog as one DataFrame, merged on first use."""
+        if not self.n_appended:
+            return self.base
+        if self._frame is None:
+            appended = pd.DataFrame(self.appended, columns=self.base.columns, copy=False)
+            self._frame = append_tracks(self.base, appended)
+        return self._frame
+
+
+class ReadWriteLock:
+    """
+    Shared lock for readers, exclusive lock for writers.
+    
+    A waiting writer holds back new readers so it cannot be starved, but a
+    thread that already reads may read again (read sections nest).
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._local = threading.local()
+    
+    @contextmanager
+    def reading(self):
+        """Hold the lock shared for the duration of a with block."""
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._condition:
+                while self._writer or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+    
+    @contextmanager
+    def writing(self):
+        """Hold the lock exclusively for the duration of a with block."""
+        with self._condition:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
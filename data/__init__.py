@@ -1,2 +1,14 @@
 """Data module for Spotify Music Recommendation System."""
-from .sample_data import get_sample_tracks, get_audio_features_columns, get_genre_list
+
+# The sample data helpers are imported on first access, so importing
+# data.loader does not load them
+_SAMPLE_DATA_NAMES = ('get_sample_tracks', 'get_audio_features_columns', 'get_genre_list')
+
+__all__ = list(_SAMPLE_DATA_NAMES)
+
+
+def __getattr__(name):
+    if name in _SAMPLE_DATA_NAMES:
+        from . import sample_data
+        return getattr(sample_data, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
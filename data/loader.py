@@ -1,29 +1,94 @@
 """
 Data loader for the full Spotify tracks dataset.
 Handles loading and caching of 114,000+ tracks efficiently.
+
+The cleaned dataset is cached on disk next to the CSV in a binary columnar
+layout: one .npy file per numeric column, and integer codes plus a string
+table per text column. The cache is keyed on the CSV's size, mtime and
+content hash together with CACHE_VERSION, so editing the CSV or the
+cleanup steps invalidates it. Arrays derived from the dataset (see
+save_cached_array) are also keyed on the version of the code deriving them.
+
+Numeric columns and cached arrays are memory-mapped read-only, so every
+process on a host that loads the dataset shares the same physical pages
+through the OS page cache instead of holding a private copy.
 """
 
+import hashlib
+import json
+import shutil
 import pandas as pd
+import numpy as np
 import os
 
 FULL_DATASET_PATH = os.path.join(os.path.dirname(__file__), 'spotify_full.csv')
 
+# Bump whenever _clean_dataset changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
 AUDIO_FEATURES = [
     'danceability', 'energy', 'loudness', 'speechiness',
     'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo'
 ]
 
+# Columns kept in the compact catalog: what the recommender and app.py use
+CATALOG_COLUMNS = [
+    'track_id', 'track_name', 'artists', 'album_name', 'popularity', 'genre'
+] + AUDIO_FEATURES
+
+# Highly repetitive text columns stored as categoricals in the compact catalog
+CATEGORICAL_COLUMNS = ['artists', 'album_name', 'genre']
+
 _cached_df = None
+_cached_compact_df = None
 
-def load_full_dataset():
-    """Load the full Spotify dataset with caching."""
-    global _cached_df
+def load_full_dataset(compact=False):
+    """
+    Load the full Spotify dataset with caching.
+    
+    With compact=True, returns the low-memory catalog instead (see
+    compact_dataset). Both variants are cached separately.
+    """
+    global _cached_df, _cached_compact_df
     
-    if _cached_df is not None:
-        return _cached_df
+    cached = _cached_compact_df if compact else _cached_df
+    if cached is not None:
+        return cached
     
-    df = pd.read_csv(FULL_DATASET_PATH)
+    df = _read_cache(compact)
+    if df is None:
+        df = _clean_dataset(pd.read_csv(FULL_DATASET_PATH))
+        _write_cache(df)
+        if compact:
+            df = compact_dataset(df)
     
+    if compact:
+        _cached_compact_df = df
+    else:
+        _cached_df = df
+    return df
+
+
+def compact_dataset(df):
+    """
+    Return a low-memory copy of the catalog.
+    
+    Keeps only CATALOG_COLUMNS, stores CATEGORICAL_COLUMNS as categoricals
+    and downcasts integer columns. Floats are left alone so feature values
+    stay exact.
+    """
+    df = df[[col for col in df.columns if col in CATALOG_COLUMNS]].copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def _clean_dataset(df):
+    """Normalize column names, fill missing values and drop duplicates."""
     df = df.rename(columns={'track_genre': 'genre'})
     
     df['track_id'] = df['track_id'].astype(str)
@@ -42,18 +107,320 @@ def load_full_dataset():
     
     df = df.reset_index(drop=True)
     
-    _cached_df = df
     return df
 
 
+def prepare_tracks(tracks, catalog):
+    """
+    Clean new track records like the dataset and shape them like a catalog.
+    
+    Args:
+        tracks: Track dicts or a DataFrame. Each needs a track_id and every
+            audio feature; missing text fields get _clean_dataset's
+            defaults and other missing columns 0.
+        catalog: DataFrame whose columns the result has
+        
+    Returns:
+        DataFrame with the catalog's columns, one row per distinct track_id
+    """
+    df = pd.DataFrame(tracks).rename(columns={'track_genre': 'genre'})
+    if df.empty:
+        return catalog.iloc[:0]
+    missing = [col for col in ['track_id'] + AUDIO_FEATURES if col not in df.columns]
+    if missing:
+        raise ValueError(f"New tracks are missing columns: {', '.join(missing)}")
+    for col in ('artists', 'album_name', 'track_name', 'genre'):
+        if col not in df.columns:
+            df[col] = None
+    df = _clean_dataset(df)
+    
+    for col in catalog.columns:
+        dtype = catalog[col].dtype
+        if col not in df.columns:
+            df[col] = False if pd.api.types.is_bool_dtype(dtype) else 0
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df[list(catalog.columns)]
+
+
+def append_tracks(catalog, tracks):
+    """
+    Return a new catalog with prepared tracks (see prepare_tracks) appended.
+    
+    Categorical columns keep their codes and gain any new categories, so a
+    compact catalog stays compact.
+    """
+    tracks = tracks.copy()
+    for col in catalog.columns:
+        dtype = catalog[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            values = tracks[col].astype(str)
+            new_categories = pd.Index(values.unique()).difference(dtype.categories)
+            if len(new_categories):
+                catalog = catalog.assign(**{col: catalog[col].cat.add_categories(new_categories)})
+            tracks[col] = values.astype(catalog[col].dtype)
+        elif pd.api.types.is_integer_dtype(dtype):
+            # Concatenating int64 lets a downcast column widen if it must
+            tracks[col] = tracks[col].round().astype(np.int64)
+        else:
+            tracks[col] = tracks[col].astype(dtype)
+    
+    df = pd.concat([catalog, tracks], ignore_index=True)
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(catalog[col]) and df[col].dtype != catalog[col].dtype:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+def get_cache_dir():
+    """Return the directory holding the binary cache for the dataset CSV."""
+    return os.path.splitext(FULL_DATASET_PATH)[0] + '.cache'
+
+
+def hash_file(path):
+    """Return the BLAKE2 hex digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_key():
+    """Return the parts of the cache key that do not depend on the CSV."""
+    return {'cache_version': CACHE_VERSION, 'pandas': pd.__version__}
+
+
+def _read_cache_meta():
+    """
+    Return the cache metadata if the cache matches the current CSV.
+    
+    The content hash is only recomputed when the mtime changed but the size
+    did not, e.g. after the file was touched or copied.
+    """
+    meta_path = os.path.join(get_cache_dir(), 'meta.json')
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stat = os.stat(FULL_DATASET_PATH)
+    except (OSError, ValueError):
+        return None
+    
+    if meta.get('key') != _cache_key() or meta['csv']['size'] != stat.st_size:
+        return None
+    if meta['csv']['mtime_ns'] != stat.st_mtime_ns:
+        if hash_file(FULL_DATASET_PATH) != meta['csv']['hash']:
+            return None
+        meta['csv']['mtime_ns'] = stat.st_mtime_ns
+        try:
+            _write_json(meta_path, meta)
+        except OSError:
+            # Only saves rehashing next time; a read-only data directory is fine
+            pass
+    return meta
+
+
+def _read_cache(compact=False):
+    """
+    Load the cleaned dataset from the binary cache, or None if stale.
+    
+    With compact=True only CATALOG_COLUMNS are read, and categorical
+    columns are built straight from the stored codes and string tables.
+    """
+    meta = _read_cache_meta()
+    if meta is None:
+        return None
+    
+    try:
+        df = read_columns(get_cache_dir(), meta['columns'], compact)
+    except (OSError, ValueError, KeyError):
+        return None
+    return compact_dataset(df) if compact else df
+
+
+def read_columns(directory, columns, compact=False):
+    """
+    Read DataFrame columns written by write_columns.
+    
+    Numeric columns are memory-mapped read-only and shared instead of
+    copied into a private block.
+    
+    Args:
+        directory: Directory holding the column files
+        columns: Column descriptions returned by write_columns
+        compact: Only read CATALOG_COLUMNS, building CATEGORICAL_COLUMNS
+            straight from the stored codes and string tables (columns
+            written as categoricals are always read back as such)
+            
+    Returns:
+        DataFrame with the stored columns
+    """
+    series_by_name = {}
+    for column in columns:
+        name = column['name']
+        if compact and name not in CATALOG_COLUMNS:
+            continue
+        path = os.path.join(directory, column['file'])
+        if column['kind'] == 'numeric':
+            series_by_name[name] = pd.Series(np.load(path, mmap_mode='r'), copy=False)
+            continue
+        
+        codes = np.load(path)
+        with open(path[:-len('.npy')] + '.txt', encoding='utf-8') as f:
+            table = f.read().split('\0')
+        if (compact and name in CATEGORICAL_COLUMNS) or column['dtype'] == 'category':
+            # Code -1 marks a missing value in both layouts
+            series = pd.Series(pd.Categorical.from_codes(codes, categories=table))
+        else:
+            values = np.array(table + [np.nan], dtype=object)[codes]
+            series = pd.Series(values, copy=False)
+            if str(series.dtype) != column['dtype']:
+                series = series.astype(column['dtype'])
+        series_by_name[name] = series
+    # copy=False keeps the memory-mapped columns shared instead of
+    # consolidating them into a private block
+    return pd.DataFrame(series_by_name, copy=False)
+
+
+def _write_cache(df):
+    """Write the cleaned dataset to the binary cache, replacing any old one."""
+    cache_dir = get_cache_dir()
+    tmp_dir = f"{cache_dir}.tmp{os.getpid()}"
+    try:
+        stat = os.stat(FULL_DATASET_PATH)
+        os.makedirs(tmp_dir, exist_ok=True)
+        
+        columns = write_columns(df, tmp_dir)
+        
+        meta = {
+            'key': _cache_key(),
+            'csv': {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': hash_file(FULL_DATASET_PATH)
+            },
+            'columns': columns
+        }
+        _write_json(os.path.join(tmp_dir, 'meta.json'), meta)
+        
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.rename(tmp_dir, cache_dir)
+    except (OSError, ValueError):
+        # The cache is an optimization; a read-only data directory is fine
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def write_columns(df, directory):
+    """
+    Write every column of a DataFrame to a directory, one file per column.
+    
+    Numeric and boolean columns are saved as .npy files. Other columns are
+    saved as int32 codes plus a NUL-separated string table.
+    
+    Returns:
+        Column descriptions to store and pass to read_columns
+    """
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        file_name = f"col{i}.npy"
+        path = os.path.join(directory, file_name)
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            np.save(path, series.to_numpy())
+            kind = 'numeric'
+        else:
+            codes, table = pd.factorize(series, use_na_sentinel=True)
+            table = [str(value) for value in table]
+            if any('\0' in value for value in table):
+                raise ValueError(f"Column {name!r} contains NUL characters")
+            np.save(path, codes.astype(np.int32))
+            with open(path[:-len('.npy')] + '.txt', 'w', encoding='utf-8') as f:
+                f.write('\0'.join(table))
+            kind = 'string'
+        columns.append({
+            'name': name, 'file': file_name, 'kind': kind, 'dtype': str(series.dtype)
+        })
+    return columns
+
+
+def _write_json(path, data):
+    """Write JSON atomically via a temporary file."""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def get_dataset_version():
+    """
+    Return a string identifying the current contents of the dataset CSV.
+    
+    Uses the content hash stored in the cache metadata when the cache is
+    fresh, and hashes the CSV otherwise.
+    """
+    meta = _read_cache_meta()
+    digest = meta['csv']['hash'] if meta is not None else hash_file(FULL_DATASET_PATH)
+    return f"{digest}-v{CACHE_VERSION}"
+
+
+def _cached_array_path(name, version):
+    """Return the cache file of a derived array built by a given builder version."""
+    return os.path.join(get_cache_dir(), f"{name}.v{int(version)}.npy")
+
+
+def load_cached_array(name, version, mmap_mode='r'):
+    """
+    Load an array derived from the dataset from the binary cache.
+    
+    Args:
+        name: Name the array was saved under
+        version: Version of the code that derives the array; arrays saved
+            by another version are ignored
+        mmap_mode: np.load memory-map mode (None reads a private copy)
+        
+    Returns:
+        The array, or None if it is missing or the cache is stale
+    """
+    if _read_cache_meta() is None:
+        return None
+    try:
+        return np.load(_cached_array_path(name, version), mmap_mode=mmap_mode)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_array(name, array, version):
+    """
+    Store an array derived from the dataset next to the cached columns.
+    
+    Args:
+        name: Name to load the array by
+        array: The array
+        version: Version of the code that derived the array. Bump it
+            whenever that code changes, so arrays cached before are rebuilt.
+    """
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    path = _cached_array_path(name, version)
+    tmp_path = f"{path[:-len('.npy')]}.tmp{os.getpid()}.npy"
+    try:
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def get_audio_features_columns():
     """Return the list of audio feature column names."""
     return AUDIO_FEATURES
 
 
-def get_dataset_stats():
-    """Get statistics about the dataset."""
-    df = load_full_dataset()
+def get_dataset_stats(df=None):
+    """Get statistics about the dataset (the full dataset if df is None)."""
+    if df is None:
+        df = load_full_dataset()
     return {
         'total_tracks': len(df),
         'total_genres': df['genre'].nunique(),
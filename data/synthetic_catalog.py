@@ -0,0 +1,309 @@
+"""
+Synthetic Spotify-like track catalogs for benchmarks and local runs.
+
+Writes CSVs with the columns of the Spotify Tracks Dataset, so the loader
+and the recommender treat them like the real data/spotify_full.csv:
+- Audio features follow distributions chosen to match the real dataset's
+  means, spreads and shapes (FEATURE_SAMPLERS). Each track's features are
+  pulled towards a per-genre profile, so genres have distinct centroids.
+- Genre sizes and artist track counts are Zipf-skewed: a few large
+  genres and prolific artists, and a long tail. There is about one artist
+  per ARTIST_RATIO tracks. Some credits have featured artists joined with
+  ';'.
+- Popularity is a per-artist base plus noise, with a share of zeros.
+- Track and album names are drawn from a word list, so search and
+  autocomplete see realistic repetition.
+
+Rows are generated in fixed-size chunks, each from its own seeded random
+generator, so a catalog of any size (10M rows included) is written with
+bounded memory, and the same rows and seed always give the same file.
+
+Usage:
+    python -m data.synthetic_catalog --rows 114000 [--seed 0] [--out path]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data import loader
+
+# Bump whenever the generated data changes, so stored catalogs are redone
+GENERATOR_VERSION = 1
+
+# Rows generated per chunk; fixed so output does not depend on memory
+CHUNK_ROWS = 250_000
+
+# Tracks per artist on average
+ARTIST_RATIO = 4
+
+# Zipf exponents of artist and genre popularity
+ARTIST_SKEW = 0.6
+GENRE_SKEW = 0.6
+
+# Weight of the genre profile in each track's audio features
+GENRE_WEIGHT = 0.4
+
+# Share of tracks in their artist's main genre
+MAIN_GENRE_SHARE = 0.8
+
+# Share of credits with one and with two featured artists
+FEATURED_SHARES = (0.12, 0.03)
+
+# Share of tracks with popularity 0, as in the real dataset
+ZERO_POPULARITY_SHARE = 0.14
+
+GENRES = [
+    'acoustic', 'afrobeat', 'alt-rock', 'alternative', 'ambient', 'anime', 'black-metal',
+    'bluegrass', 'blues', 'brazil', 'breakbeat', 'british', 'cantopop', 'chicago-house',
+    'children', 'chill', 'classical', 'club', 'comedy', 'country', 'dance', 'dancehall',
+    'death-metal', 'deep-house', 'detroit-techno', 'disco', 'disney', 'drum-and-bass', 'dub',
+    'dubstep', 'edm', 'electro', 'electronic', 'emo', 'folk', 'forro', 'french', 'funk',
+    'garage', 'german', 'gospel', 'goth', 'grindcore', 'groove', 'grunge', 'guitar', 'happy',
+    'hard-rock', 'hardcore', 'hardstyle', 'heavy-metal', 'hip-hop', 'honky-tonk', 'house',
+    'idm', 'indian', 'indie-pop', 'indie', 'industrial', 'iranian', 'j-dance', 'j-idol',
+    'j-pop', 'j-rock', 'jazz', 'k-pop', 'kids', 'latin', 'latino', 'malay', 'mandopop',
+    'metal', 'metalcore', 'minimal-techno', 'mpb', 'new-age', 'opera', 'pagode', 'party',
+    'piano', 'pop-film', 'pop', 'power-pop', 'progressive-house', 'psych-rock', 'punk-rock',
+    'punk', 'r-n-b', 'reggae', 'reggaeton', 'rock-n-roll', 'rock', 'rockabilly', 'romance',
+    'sad', 'salsa', 'samba', 'sertanejo', 'show-tunes', 'singer-songwriter', 'ska', 'sleep',
+    'songwriter', 'soul', 'spanish', 'study', 'swedish', 'synth-pop', 'tango', 'techno',
+    'trance', 'trip-hop', 'turkish', 'world-music'
+]
+
+WORDS = '''
+love night heart baby dream fire light time life world girl boy home summer rain sun moon
+star sky road city river ocean dance feel blue red gold black white wild young forever
+never alone together away back down high low lost found broken sweet little big crazy
+lonely happy sad good bad last first new old free real true fall rise run walk fly burn
+shine cry smile kiss touch hold call come stay go wait know want need give take tonight
+today tomorrow yesterday morning midnight dark shadow ghost angel devil heaven paradise
+fever sugar honey diamond silver electric magic secret story song music radio echo
+thunder storm wind snow winter spring autumn garden flower rose fade glow wave tide
+mountain valley desert island highway train window door mirror dreamer lover stranger
+friend enemy king queen hero soul mind eyes hands lips voice body blood bones skin
+memories promise chance reason rhythm beat groove party club street neon velvet
+'''.split()
+
+FIRST_NAMES = '''
+alex sam jordan taylor casey riley jamie morgan avery quinn luca mia noah emma leo ava
+kai zoe max lily oscar ruby felix isla hugo nina omar sara ivan lena theo maya diego
+clara yuki hana marco elena amir leila jonas freya tomas ines rafael sofia milo nora
+'''.split()
+
+LAST_NAMES = '''
+smith garcia kim nguyen silva rossi muller martin lopez brown wilson novak costa sato
+jensen park ali khan reyes moreau cohen berg santos fischer ito walker young hill
+rivera torres perez evans turner baker adams nelson carter mitchell lee wright scott
+'''.split()
+
+BAND_NOUNS = '''
+wolves kings echoes lights riders ghosts saints strangers dreamers machines rebels
+shadows tigers foxes birds giants pilots sailors monks sirens
+'''.split()
+
+COLUMNS = [
+    'Unnamed: 0', 'track_id', 'artists', 'album_name', 'track_name', 'popularity',
+    'duration_ms', 'explicit', 'danceability', 'energy', 'key', 'loudness', 'mode',
+    'speechiness', 'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo',
+    'time_signature', 'track_genre'
+]
+
+_ID_ALPHABET = np.frombuffer(
+    b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz', dtype=np.uint8
+)
+
+
+def _instrumentalness(rng, size):
+    """Mostly near zero, with a minority of instrumental tracks near one."""
+    instrumental = rng.random(size) < 0.22
+    return np.where(instrumental, rng.beta(4.0, 1.3, size), rng.beta(0.2, 40.0, size))
+
+
+def _tempo(rng, size):
+    """Around 122 BPM, with a few tracks the analysis gave no tempo."""
+    tempo = np.clip(rng.normal(122.0, 29.0, size), 40.0, 240.0)
+    return np.where(rng.random(size) < 0.001, 0.0, tempo)
+
+
+# One sampler per audio feature: (rng, size) -> values
+FEATURE_SAMPLERS = {
+    'danceability': lambda rng, size: rng.beta(4.5, 3.4, size),
+    'energy': lambda rng, size: rng.beta(2.0, 1.15, size),
+    'loudness': lambda rng, size: np.clip(3.0 - rng.gamma(2.2, 5.0, size), -49.0, 4.5),
+    'speechiness': lambda rng, size: np.minimum(0.022 + rng.beta(0.9, 12.0, size), 1.0),
+    'acousticness': lambda rng, size: rng.beta(0.45, 1.0, size),
+    'instrumentalness': _instrumentalness,
+    'liveness': lambda rng, size: np.minimum(0.02 + rng.beta(1.6, 7.0, size), 1.0),
+    'valence': lambda rng, size: rng.beta(1.7, 1.9, size),
+    'tempo': _tempo,
+}
+
+
+def _zipf_cdf(n, skew):
+    """Return the cumulative distribution of ranks 1..n under a Zipf law."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+
+def _words(indices):
+    """Return an object array of title-cased words from WORDS."""
+    return np.array([word.title() for word in WORDS], dtype=object)[indices]
+
+
+class _Catalog:
+    """The catalog-wide tables every chunk draws from: genres and artists."""
+    
+    def __init__(self, n_rows, seed):
+        rng = np.random.default_rng([seed, GENERATOR_VERSION])
+        self.genre_cdf = _zipf_cdf(len(GENRES), GENRE_SKEW)
+        # Shuffle so the largest genres are not alphabetical
+        self.genre_order = rng.permutation(len(GENRES))
+        self.genre_profiles = np.column_stack([
+            sampler(rng, len(GENRES)) for sampler in FEATURE_SAMPLERS.values()
+        ])
+        
+        n_artists = max(n_rows // ARTIST_RATIO, 1)
+        self.artist_cdf = _zipf_cdf(n_artists, ARTIST_SKEW)
+        self.artist_genres = self.genres(rng, n_artists)
+        self.artist_popularity = rng.beta(2.0, 3.0, n_artists) * 80
+        self.artist_names = self._artist_names(rng, n_artists)
+    
+    def genres(self, rng, size):
+        """Draw genre indices with Zipf-skewed sizes."""
+        return self.genre_order[np.searchsorted(self.genre_cdf, rng.random(size))]
+    
+    def artists(self, rng, size):
+        """Draw artist indices, prolific artists more often."""
+        return np.searchsorted(self.artist_cdf, rng.random(size))
+    
+    @staticmethod
+    def _artist_names(rng, n_artists):
+        """Return unique names: people ("Mia Novak") and bands ("The Neon Wolves")."""
+        people = [f"{first.title()} {last.title()}" for first in FIRST_NAMES for last in LAST_NAMES]
+        bands = [f"The {word.title()} {noun.title()}" for word in WORDS for noun in BAND_NOUNS]
+        names = np.array(people + bands, dtype=object)
+        names = names[rng.permutation(len(names))]
+        # Past the name list, names repeat with a numeric suffix
+        indices = np.arange(n_artists)
+        base = names[indices % len(names)]
+        suffix = np.where(indices >= len(names), ' ' + (indices // len(names) + 1).astype(str), '')
+        return base + suffix.astype(object)
+
+
+def _track_ids(rng, size):
+    """Return random 22-character base-62 IDs like Spotify's."""
+    codes = _ID_ALPHABET[rng.integers(0, len(_ID_ALPHABET), (size, 22))]
+    return codes.view('S22').ravel().astype(str)
+
+
+def _track_names(rng, size):
+    """Return names of one to four words, some with a version suffix."""
+    lengths = rng.choice(4, size, p=[0.25, 0.4, 0.25, 0.1]) + 1
+    words = _words(rng.integers(0, len(WORDS), (size, 4)))
+    names = words[:, 0]
+    for position in range(1, 4):
+        names = np.where(lengths > position, names + ' ' + words[:, position], names)
+    versions = np.array(['', ' - Remix', ' - Live', ' (Acoustic)'], dtype=object)
+    return names + versions[rng.choice(4, size, p=[0.94, 0.03, 0.02, 0.01])]
+
+
+def _chunk(catalog, start, size, seed):
+    """Generate rows start..start+size of a catalog as a DataFrame."""
+    rng = np.random.default_rng([seed, GENERATOR_VERSION, start // CHUNK_ROWS])
+    
+    artists = catalog.artists(rng, size)
+    credits = catalog.artist_names[artists]
+    draws = rng.random(size)
+    n_featured = (draws < sum(FEATURED_SHARES)).astype(int) + (draws < FEATURED_SHARES[1])
+    for count in (1, 2):
+        featured = catalog.artists(rng, size)
+        add = (n_featured >= count) & (featured != artists)
+        credits = np.where(add, credits + ';' + catalog.artist_names[featured], credits)
+    
+    genres = np.where(
+        rng.random(size) < MAIN_GENRE_SHARE, catalog.artist_genres[artists], catalog.genres(rng, size)
+    )
+    features = np.column_stack([sampler(rng, size) for sampler in FEATURE_SAMPLERS.values()])
+    features = (1 - GENRE_WEIGHT) * features + GENRE_WEIGHT * catalog.genre_profiles[genres]
+    
+    popularity = np.clip(np.rint(catalog.artist_popularity[artists] + rng.normal(0, 12, size)), 0, 100)
+    popularity[rng.random(size) < ZERO_POPULARITY_SHARE] = 0
+    
+    # Each artist has a handful of albums, named from the word list
+    albums = artists * 7 + rng.integers(0, 3, size)
+    album_names = _words(albums % len(WORDS)) + ' ' + _words((albums * 13 + 5) % len(WORDS))
+    
+    df = pd.DataFrame({
+        'Unnamed: 0': np.arange(start, start + size),
+        'track_id': _track_ids(rng, size),
+        'artists': credits,
+        'album_name': album_names,
+        'track_name': _track_names(rng, size),
+        'popularity': popularity.astype(np.int64),
+        'duration_ms': np.rint(rng.lognormal(np.log(215_000), 0.35, size)).astype(np.int64),
+        'explicit': rng.random(size) < 0.085,
+        'key': rng.integers(0, 12, size),
+        'mode': (rng.random(size) < 0.64).astype(np.int64),
+        'time_signature': rng.choice([4, 3, 5, 1], size, p=[0.9, 0.08, 0.015, 0.005]),
+        'track_genre': np.array(GENRES, dtype=object)[genres],
+    })
+    for i, name in enumerate(FEATURE_SAMPLERS):
+        df[name] = np.round(features[:, i], 3)
+    return df[COLUMNS]
+
+
+def generate_catalog(n_rows, seed=0):
+    """
+    Generate a synthetic catalog in chunks.
+    
+    Args:
+        n_rows: Number of tracks
+        seed: Random seed; the same n_rows and seed give the same rows
+        
+    Yields:
+        DataFrames of at most CHUNK_ROWS rows with the dataset's CSV columns
+    """
+    catalog = _Catalog(n_rows, seed)
+    for start in range(0, n_rows, CHUNK_ROWS):
+        yield _chunk(catalog, start, min(CHUNK_ROWS, n_rows - start), seed)
+
+
+def write_catalog(path, n_rows, seed=0):
+    """
+    Write a synthetic catalog CSV, replacing the file once it is complete.
+    
+    Returns:
+        The path written
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        for i, chunk in enumerate(generate_catalog(n_rows, seed)):
+            chunk.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Spotify-like catalog CSV.")
+    parser.add_argument('--rows', type=int, required=True, help="Number of tracks")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--out', default=None, help="CSV path (defaults to the loader's dataset path)")
+    parser.add_argument('--force', action='store_true', help="Overwrite an existing file")
+    args = parser.parse_args()
+    
+    path = args.out or loader.FULL_DATASET_PATH
+    if os.path.exists(path) and not args.force:
+        parser.error(f"{path} exists; pass --force to overwrite it")
+    write_catalog(path, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} synthetic tracks to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Min-max feature scaling with NumPy only.
+
+Covers the part of scikit-learn's MinMaxScaler the recommender uses (fit,
+transform, fit_transform and the fitted data_min_/data_max_), with the
+same arithmetic, so scaled features and the caches derived from them do
+not change. Importing scikit-learn takes about a second, which the
+serving path no longer pays.
+"""
+
+import numpy as np
+
+
+class MinMaxScaler:
+    """Scale every feature to [0, 1] by the minimum and maximum seen in fit()."""
+    
+    def fit(self, X):
+        """
+        Learn the per-feature minimum and maximum.
+        
+        Args:
+            X: Array of shape (n_samples, n_features); NaNs are ignored
+            
+        Returns:
+            The scaler itself
+        """
+        X = np.asarray(X, dtype=np.float64)
+        self.data_min_ = np.nanmin(X, axis=0)
+        self.data_max_ = np.nanmax(X, axis=0)
+        self.data_range_ = self.data_max_ - self.data_min_
+        # Near-constant features keep their offset but are not stretched
+        data_range = self.data_range_.copy()
+        data_range[data_range < 10 * np.finfo(data_range.dtype).eps] = 1.0
+        self.scale_ = 1.0 / data_range
+        self.min_ = 0.0 - self.data_min_ * self.scale_
+        self.n_samples_seen_ = X.shape[0]
+        return self
+    
+    def transform(self, X):
+        """Return a scaled float64 copy of X."""
+        X = np.array(X, dtype=np.float64)
+        X *= self.scale_
+        X += self.min_
+        return X
+    
+    def fit_transform(self, X):
+        """Fit to X and return it scaled."""
+        return self.fit(X).transform(X)
@@ -0,0 +1,131 @@
+"""
+Precomputed genre index and genre statistics.
+
+Built once per catalog: the sorted genre list, each genre's rows in both
+catalog and popularity order, track counts, and per-genre mean audio
+features (centroids). Browsing a genre is then a slice of a stored row
+list, so reading a page costs O(page size) however large the genre is.
+
+Counts and centroids can also be updated as tracks are added to or removed
+from a live catalog (see update_stats); the row lists cannot.
+"""
+
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+class GenreIndex:
+    """Row lists, counts and feature centroids for every genre."""
+    
+    def __init__(self, genres, popularity, features):
+        """
+        Args:
+            genres: Genre of every row
+            popularity: Popularity of every row
+            features: Audio feature matrix of shape (n_rows, n_features)
+        """
+        codes, names = pd.factorize(pd.Series(genres, copy=False))
+        # Sort by name here: factorize(sort=True) keeps category order for
+        # categoricals
+        names = np.array([str(name) for name in names], dtype=object)
+        name_order = np.argsort(names, kind='stable')
+        codes = np.argsort(name_order)[codes]
+        self.genres = names[name_order].tolist()
+        self.codes = {name: code for code, name in enumerate(self.genres)}
+        n_genres = len(self.genres)
+        
+        # Rows grouped by genre, in catalog order within each genre
+        order = np.argsort(codes, kind='stable')
+        self.offsets = np.searchsorted(codes[order], np.arange(n_genres + 1))
+        self.rows = order.astype(np.int32)
+        self.counts = np.diff(self.offsets)
+        
+        # The same groups, most popular first (ties by catalog order)
+        order = np.lexsort((np.arange(len(codes)), -np.asarray(popularity), codes))
+        self.popular_rows = order.astype(np.int32)
+        
+        features = np.asarray(features, dtype=np.float64)
+        self.sums = np.zeros((n_genres, features.shape[1]))
+        np.add.at(self.sums, codes, features)
+        self.centroids = self.sums / np.maximum(self.counts, 1)[:, None]
+    
+    def state(self):
+        """Return the arrays and genre list from_state rebuilds the index from."""
+        return {
+            'genres': self.genres, 'offsets': self.offsets, 'rows': self.rows,
+            'counts': self.counts, 'popular_rows': self.popular_rows,
+            'sums': self.sums, 'centroids': self.centroids
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an index from state() without grouping any rows."""
+        index = cls.__new__(cls)
+        vars(index).update(state)
+        index.codes = {name: code for code, name in enumerate(index.genres)}
+        return index
+    
+    def __contains__(self, genre):
+        return self.count(genre) > 0
+    
+    def update_stats(self, genres, features, sign=1):
+        """
+        Add tracks to (sign=1) or remove them from (sign=-1) the statistics.
+        
+        Genres not seen before get an empty row list. Arrays are replaced,
+        not modified, since the current ones may be read-only.
+        
+        Args:
+            genres: Genre of every track
+            features: Audio feature matrix of those tracks
+            sign: 1 when adding the tracks, -1 when removing them
+        """
+        genres = [str(genre) for genre in genres]
+        for genre in dict.fromkeys(genres):
+            if genre not in self.codes:
+                self._add_genre(genre)
+        codes = np.array([self.codes[genre] for genre in genres], dtype=np.intp)
+        sums = self.sums.copy()
+        counts = self.counts.copy()
+        np.add.at(sums, codes, sign * np.asarray(features, dtype=np.float64))
+        np.add.at(counts, codes, sign)
+        self.sums, self.counts = sums, counts
+        self.centroids = sums / np.maximum(counts, 1)[:, None]
+    
+    def _add_genre(self, genre):
+        """Insert a genre with no rows, keeping the genre list sorted."""
+        code = bisect.bisect(self.genres, genre)
+        self.genres = self.genres[:code] + [genre] + self.genres[code:]
+        self.codes = {name: code for code, name in enumerate(self.genres)}
+        self.offsets = np.insert(self.offsets, code, self.offsets[code])
+        self.sums = np.insert(self.sums, code, 0, axis=0)
+        self.counts = np.insert(self.counts, code, 0)
+    
+    def rows_of(self, genre, by_popularity=False):
+        """
+        Return the rows of a genre.
+        
+        Args:
+            genre: Genre name
+            by_popularity: Most popular first instead of catalog order
+            
+        Returns:
+            NumPy array of row positions (empty for an unknown genre)
+        """
+        code = self.codes.get(genre)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        rows = self.popular_rows if by_popularity else self.rows
+        return rows[self.offsets[code]:self.offsets[code + 1]]
+    
+    def count(self, genre):
+        """Return the number of tracks in a genre."""
+        code = self.codes.get(genre)
+        return 0 if code is None else int(self.counts[code])
+    
+    def centroid(self, genre):
+        """Return the mean audio features of a genre, or None if unknown."""
+        code = self.codes.get(genre)
+        return None if code is None else self.centroids[code]
@@ -0,0 +1,114 @@
+"""
+Micro-batching scheduler for concurrent similarity queries.
+
+Every exact query scores its unit vector against the whole catalog, which
+is bound by reading the feature matrix. When many threads query at once, a
+MicroBatcher collects their vectors for up to ``max_wait_ms`` (or until
+``max_batch_size`` are waiting) and scores them with one matrix-matrix
+product, so the matrix is read once per batch instead of once per query.
+Each caller then gets its own row of the result.
+
+The first request of a batch waits at most ``max_wait_ms``, which bounds
+the latency added to any single query.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """Coalesces concurrent score requests into batched matrix products."""
+    
+    def __init__(self, score, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            score: Function mapping a (n_queries, n_dims) matrix to a
+                (n_queries, n_rows) score matrix
+            max_batch_size: Most queries scored per product
+            max_wait_ms: Longest time a request waits for others to join
+        """
+        self._score = score
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.requests = 0
+    
+    def score(self, vector):
+        """
+        Score one query vector, batched with concurrent callers.
+        
+        Args:
+            vector: Query of shape (n_dims,)
+            
+        Returns:
+            Scores of shape (n_rows,), owned by the caller
+        """
+        future = Future()
+        self._queue.put((vector, future))
+        self._ensure_thread()
+        return future.result()
+    
+    def _ensure_thread(self):
+        """Start the scoring thread on first use."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name='micro-batcher', daemon=True
+                    )
+                    self._thread.start()
+    
+    def _collect(self):
+        """Block for one request, then gather more until full or timed out."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued, then wait out the deadline
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """Score batches until the process exits."""
+        while True:
+            batch = self._collect()
+            futures = [future for _, future in batch]
+            try:
+                scores = self._score(np.vstack([vector for vector, _ in batch]))
+            except Exception as error:
+                for future in futures:
+                    future.set_exception(error)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            for row, future in enumerate(futures):
+                future.set_result(scores[row])
+    
+    def stats(self):
+        """Return the number of batches and requests scored so far."""
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0
+        }
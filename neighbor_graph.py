@@ -0,0 +1,248 @@
+"""
+Precomputed top-K neighbour graph for the "By Song" recommendations.
+
+The build step scores every track against the catalog once and stores the
+K nearest neighbours of each track, both with and without same-artist
+exclusion, as .npy files next to the dataset CSV. At runtime the files are
+memory-mapped, so serving a seed's neighbours is a row read.
+
+Files written next to data/spotify_full.csv:
+- spotify_full.neighbors.npy: int32 row positions, shape (2, n_tracks, K)
+- spotify_full.neighbor_scores.npy: similarities, shape (2, n_tracks, K)
+- spotify_full.neighbors.json: metadata used to detect a stale graph: the
+  dataset version (see loader.get_dataset_version) and FEATURES_VERSION
+
+Build it with:
+    python neighbor_graph.py --k 50
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+from data import loader
+
+FORMAT_VERSION = 1
+DEFAULT_K = 50
+
+# Seeds handed to a worker per task
+SEEDS_PER_TASK = 2048
+
+# Layer of the graph arrays holding each exclusion mode
+ALL_ARTISTS = 0
+OTHER_ARTISTS = 1
+
+_worker_recommender = None
+
+
+def graph_paths(csv_path=None):
+    """Return the (neighbors, scores, metadata) file paths for a dataset CSV."""
+    base = os.path.splitext(csv_path or loader.FULL_DATASET_PATH)[0]
+    return (
+        base + '.neighbors.npy',
+        base + '.neighbor_scores.npy',
+        base + '.neighbors.json'
+    )
+
+
+class NeighborGraph:
+    """Read-only top-K neighbour lists for every track."""
+    
+    def __init__(self, neighbors, scores):
+        self.neighbors = neighbors
+        self.scores = scores
+        self.k = neighbors.shape[2]
+    
+    def get(self, idx, n_recommendations, exclude_same_artist=False):
+        """
+        Return the stored neighbours of a track.
+        
+        Args:
+            idx: Row position of the seed track
+            n_recommendations: Number of neighbours (at most k)
+            exclude_same_artist: Whether to use the same-artist-excluded list
+            
+        Returns:
+            Tuple of (row positions, similarity scores), best first
+        """
+        layer = OTHER_ARTISTS if exclude_same_artist else ALL_ARTISTS
+        n_recommendations = max(int(n_recommendations), 0)
+        rows = np.asarray(self.neighbors[layer, idx, :n_recommendations], dtype=np.intp)
+        scores = np.asarray(self.scores[layer, idx, :n_recommendations])
+        valid = rows >= 0
+        return rows[valid], scores[valid]
+
+
+def load_neighbor_graph(n_tracks, dtype, dataset_version, features_version, csv_path=None):
+    """
+    Memory-map the neighbour graph for a dataset if it is present and fresh.
+    
+    Args:
+        n_tracks: Number of tracks in the loaded catalog
+        dtype: Similarity dtype the recommender scores with
+        dataset_version: Version of the loaded dataset (see
+            loader.get_dataset_version), which changes with the CSV's
+            contents and the loader's cleaning but not with its mtime
+        features_version: Version of the code that scaled the features
+        csv_path: Dataset CSV (defaults to the loader's dataset path)
+        
+    Returns:
+        NeighborGraph, or None when the graph is missing or stale
+    """
+    neighbors_path, scores_path, meta_path = graph_paths(csv_path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if (meta.get('format_version') != FORMAT_VERSION
+            or meta.get('dataset_version') != dataset_version
+            or meta.get('features_version') != features_version
+            or meta.get('n_tracks') != n_tracks
+            or meta.get('dtype') != np.dtype(dtype).name):
+        return None
+    
+    try:
+        neighbors = np.load(neighbors_path, mmap_mode='r')
+        scores = np.load(scores_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if neighbors.shape != (2, n_tracks, meta['k']) or scores.shape != neighbors.shape:
+        return None
+    return NeighborGraph(neighbors, scores)
+
+
+def _init_worker():
+    """Create the worker's recommender unless it was inherited via fork."""
+    global _worker_recommender
+    if _worker_recommender is None:
+        from recommendation_engine import MusicRecommender
+        _worker_recommender = MusicRecommender()
+
+
+def _rank_seed_range(task):
+    """Compute both neighbour lists for a range of seed rows."""
+    start, stop, k = task
+    recommender = _worker_recommender
+    chunk_size = recommender.batch_chunk_size()
+    
+    neighbors = np.full((2, stop - start, k), -1, dtype=np.int32)
+    scores = np.full((2, stop - start, k), -np.inf, dtype=recommender.dtype)
+    for chunk_start in range(start, stop, chunk_size):
+        seeds = np.arange(chunk_start, min(chunk_start + chunk_size, stop))
+        similarities = recommender._score(recommender.unit_features[seeds])
+        for row, seed in enumerate(seeds):
+            slot = seed - start
+            # Same-artist exclusion only adds -inf entries to the buffer, so
+            # the unrestricted list must be taken first
+            for layer, exclude_same_artist in ((ALL_ARTISTS, False), (OTHER_ARTISTS, True)):
+                top_indices, top_scores = recommender._rank_seed(
+                    seed, similarities[row], k, exclude_same_artist
+                )
+                neighbors[layer, slot, :len(top_indices)] = top_indices
+                scores[layer, slot, :len(top_indices)] = top_scores
+    return start, neighbors, scores
+
+
+def build_neighbor_graph(recommender=None, k=DEFAULT_K, workers=None, csv_path=None):
+    """
+    Compute and write the top-K neighbour graph for the dataset.
+    
+    Args:
+        recommender: MusicRecommender to build from (created when None),
+            without catalog updates
+        k: Neighbours stored per track and exclusion mode
+        workers: Worker processes (defaults to the CPU count)
+        csv_path: Dataset CSV the graph belongs to
+        
+    Returns:
+        Path of the metadata file
+    """
+    global _worker_recommender
+    from recommendation_engine import MusicRecommender, FEATURES_VERSION
+    
+    if recommender is None:
+        recommender = MusicRecommender()
+    if recommender.revision:
+        raise ValueError("The recommender's catalog was updated; build from the dataset itself")
+    csv_path = csv_path or loader.FULL_DATASET_PATH
+    n_tracks = len(recommender.df)
+    k = min(int(k), max(n_tracks - 1, 1))
+    
+    # The arrays are written to temporary files and renamed into place, so
+    # recommenders that mapped the old files keep reading intact data
+    neighbors_path, scores_path, meta_path = graph_paths(csv_path)
+    tmp_neighbors_path = f"{neighbors_path}.tmp{os.getpid()}"
+    tmp_scores_path = f"{scores_path}.tmp{os.getpid()}"
+    try:
+        neighbors = np.lib.format.open_memmap(
+            tmp_neighbors_path, mode='w+', dtype=np.int32, shape=(2, n_tracks, k)
+        )
+        scores = np.lib.format.open_memmap(
+            tmp_scores_path, mode='w+', dtype=recommender.dtype, shape=(2, n_tracks, k)
+        )
+        
+        tasks = [
+            (start, min(start + SEEDS_PER_TASK, n_tracks), k)
+            for start in range(0, n_tracks, SEEDS_PER_TASK)
+        ]
+        
+        # Forked workers inherit the recommender instead of reloading the CSV
+        _worker_recommender = recommender
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        try:
+            with context.Pool(workers, initializer=_init_worker) as pool:
+                blocks = pool.imap_unordered(_rank_seed_range, tasks)
+                for start, block_neighbors, block_scores in blocks:
+                    stop = start + block_neighbors.shape[1]
+                    neighbors[:, start:stop] = block_neighbors
+                    scores[:, start:stop] = block_scores
+        finally:
+            _worker_recommender = None
+        
+        neighbors.flush()
+        scores.flush()
+        del neighbors, scores
+        
+        # Without metadata no new reader pairs the old and new arrays
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        os.replace(tmp_neighbors_path, neighbors_path)
+        os.replace(tmp_scores_path, scores_path)
+    finally:
+        for path in (tmp_neighbors_path, tmp_scores_path):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    # Metadata goes last so a partial build is never picked up
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'dataset_version': recommender.source_version,
+        'features_version': FEATURES_VERSION,
+        'n_tracks': n_tracks,
+        'k': k,
+        'dtype': np.dtype(recommender.dtype).name
+    }
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+    return meta_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the top-K neighbour graph.")
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help="Neighbours per track")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+    
+    path = build_neighbor_graph(k=args.k, workers=args.workers)
+    print(f"Wrote neighbour graph metadata to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Quantized first-pass scan with exact re-ranking.
+
+Each dimension of the unit-vector matrix is quantized to uint8 with its
+own offset and scale, and stored dimension-major so a scan reads one byte
+per row and dimension (a quarter of float32). A query scores every row
+against the codes to pick candidates, then only those candidates are
+re-scored exactly against the float vectors.
+
+Quantization shifts every row's approximate score by the same per-query
+constant, so the constant is dropped and only the ranking is used.
+
+Tuning knob:
+- n_candidates: Rows re-scored exactly per query. More means higher recall
+  at slightly higher latency. A query that asks for more results (see
+  QuantizedIndex.search) re-scores more rows.
+"""
+
+import numpy as np
+
+DEFAULT_CANDIDATES = 256
+
+# Largest code value
+LEVELS = 255
+
+# Bump whenever quantize changes so cached codes are rebuilt
+CODES_VERSION = 1
+
+
+def quantize(vectors):
+    """
+    Quantize each dimension of a matrix to uint8.
+    
+    Args:
+        vectors: Matrix of shape (n_rows, n_dims)
+        
+    Returns:
+        Tuple of (codes of shape (n_dims, n_rows), per-dimension offsets,
+        per-dimension scales) with vectors ~= offsets + codes.T * scales
+    """
+    vectors = np.asarray(vectors)
+    offsets = vectors.min(axis=0).astype(np.float64)
+    spans = vectors.max(axis=0).astype(np.float64) - offsets
+    scales = np.where(spans > 0, spans / LEVELS, 1.0)
+    codes = np.empty((vectors.shape[1], vectors.shape[0]), dtype=np.uint8)
+    for dim in range(vectors.shape[1]):
+        codes[dim] = np.rint((vectors[:, dim] - offsets[dim]) / scales[dim])
+    return codes, offsets, scales
+
+
+class QuantizedIndex:
+    """uint8 copy of a unit-vector matrix for candidate scans."""
+    
+    def __init__(self, vectors, n_candidates=DEFAULT_CANDIDATES, quantized=None):
+        """
+        Args:
+            vectors: Unit vectors of shape (n_rows, n_dims), used for the
+                exact re-ranking
+            n_candidates: Rows re-scored exactly per query
+            quantized: Optional (codes, offsets, scales) from quantize() over
+                the same vectors, to skip quantizing
+        """
+        self.vectors = vectors
+        self.n_candidates = max(int(n_candidates), 1)
+        self.codes, self.offsets, self.scales = quantized or quantize(vectors)
+    
+    def scan(self, query):
+        """Return approximate scores of every row, up to a per-query constant."""
+        weights = (np.asarray(query, dtype=np.float64) * self.scales).astype(np.float32)
+        return np.einsum('ji,j->i', self.codes, weights, dtype=np.float32)
+    
+    def search(self, query, min_candidates=0):
+        """
+        Pick candidates from the quantized scan and score them exactly.
+        
+        Args:
+            query: Unit vector of shape (n_dims,)
+            min_candidates: Re-score at least this many rows. Callers that
+                drop some rows afterwards pass the results they need plus
+                the rows they may drop, so enough remain.
+                
+        Returns:
+            Tuple of (row positions in ascending order, cosine similarities)
+        """
+        approx = self.scan(query)
+        n_rows = len(approx)
+        n_candidates = max(self.n_candidates, int(min_candidates))
+        if n_candidates < n_rows:
+            positions = np.argpartition(approx, n_rows - n_candidates)[n_rows - n_candidates:]
+            positions.sort()
+        else:
+            positions = np.arange(n_rows)
+        query = np.asarray(query, dtype=self.vectors.dtype)
+        scores = self.vectors[positions] @ query
+        return positions, scores
@@ -3,16 +3,150 @@ Music Recommendation Engine using Content-Based Filtering.
 Uses cosine similarity on audio features to find similar songs.
 
 Libraries used:
-- scikit-learn: For cosine similarity and feature scaling
 - pandas: For data manipulation
-- numpy: For numerical operations
+- numpy: For numerical operations and feature scaling (see feature_scaling.py)
 """
 
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
-from data.loader import load_full_dataset, get_audio_features_columns
+from data.loader import (
+    load_full_dataset, get_audio_features_columns, get_dataset_version,
+    load_cached_array, save_cached_array, prepare_tracks
+)
+from feature_scaling import MinMaxScaler
+from ann_index import IVFIndex
+from quantized_index import QuantizedIndex, DEFAULT_CANDIDATES, CODES_VERSION
+from neighbor_graph import load_neighbor_graph
+from search_index import TrigramIndex, POSTINGS_VERSION
+from autocomplete import PrefixIndex, normalize, matching
+from track_results import TrackResults, gather
+from artist_index import ArtistIndex, split_credit, credits_naming
+from genre_index import GenreIndex
+from result_cache import ResultCache, DEFAULT_CAPACITY
+from micro_batch import MicroBatcher, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS
+from catalog_updates import AppendBuffer, Catalog, ReadWriteLock
+from snapshot import SnapshotError, default_snapshot_path, read_snapshot, write_snapshot
+
+# Upper bound for the similarity buffer of one chunk in batch queries
+BATCH_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Columns render_song_card and the feature charts read from a track dict
+CARD_COLUMNS = [
+    'track_id', 'track_name', 'artists', 'album_name', 'genre',
+    'danceability', 'energy', 'valence'
+]
+
+# Columns of the track listings (get_all_tracks, get_popular_tracks)
+LISTING_COLUMNS = ['track_id', 'track_name', 'artists', 'album_name', 'popularity', 'genre']
+
+# Bump whenever scaling or _normalize changes so the cached scaled and unit
+# feature matrices are rebuilt and neighbour graphs are ignored
+FEATURES_VERSION = 1
+
+# Results precomputed per mood preset: the app's maximum of 20 plus headroom
+MOOD_RANK_DEPTH = 50
+
+# Tracks added or removed since the indexes were built before they are
+# rebuilt: this fraction of the indexed tracks, but at least COMPACT_MIN_ROWS
+COMPACT_FRACTION = 1 / 32
+COMPACT_MIN_ROWS = 1024
+
+# Options that shape the prepared state, so a snapshot must have been
+# saved with the same ones
+SNAPSHOT_OPTIONS = ('dtype', 'search', 'ann_cells', 'low_memory')
+
+
+def builder_versions(mood_presets):
+    """
+    Describe the code that built a recommender's prepared arrays.
+    
+    A snapshot saved by other code is not restored, since its features,
+    postings, codes or mood rankings would differ from what this code
+    builds.
+    
+    Args:
+        mood_presets: The recommender's MOOD_PRESETS
+        
+    Returns:
+        Dict of builder versions and a digest of the mood presets
+    """
+    moods = json.dumps([mood_presets, MOOD_RANK_DEPTH], sort_keys=True)
+    return {
+        'features': FEATURES_VERSION,
+        'postings': POSTINGS_VERSION,
+        'codes': CODES_VERSION,
+        'moods': hashlib.blake2b(moods.encode(), digest_size=16).hexdigest()
+    }
+
+
+def limit_blas_threads(n_threads):
+    """
+    Cap the threads BLAS may use per matrix product, for the whole process.
+    
+    Many sessions scoring at once each get a core instead of every product
+    fanning out over all cores. Needs threadpoolctl, which is only imported
+    here so that loading this module stays cheap.
+    
+    Returns:
+        Whether the limit was applied
+    """
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return False
+    threadpool_limits(limits=int(n_threads), user_api='blas')
+    return True
+
+
+def select_top_k(scores, k, exclude=None):
+    """
+    Return the row positions of the k highest scores, best first.
+    
+    Uses a partial partition instead of sorting the whole vector. Ties are
+    broken by the lower row position so rankings are deterministic.
+    
+    Args:
+        scores: 1-D array of scores. Modified in place when ``exclude`` is
+            given, so pass a scratch buffer.
+        k: Number of positions to return
+        exclude: Optional row positions or boolean mask to leave out
+        
+    Returns:
+        NumPy array of at most k row positions
+    """
+    if exclude is not None:
+        scores[exclude] = -np.inf
+    
+    n_rows = scores.shape[0]
+    k = min(int(k), n_rows)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    if k < n_rows:
+        threshold = np.partition(scores, n_rows - k)[n_rows - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n_rows)
+    
+    order = np.lexsort((candidates, -scores[candidates]))[:k]
+    top_indices = candidates[order]
+    return top_indices[scores[top_indices] > -np.inf]
+
+
+def _reads_catalog(method):
+    """Run a MusicRecommender method under the shared side of the catalog lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._catalog_lock.reading():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class MusicRecommender:
@@ -29,46 +163,473 @@ class MusicRecommender:
     - Liveness: Presence of audience (0.0 to 1.0)
     - Valence: Musical positiveness (0.0 to 1.0)
     - Tempo: Estimated tempo in BPM
+    
+    Scaled features are also stored as L2-normalized unit vectors, so cosine
+    similarity against the whole catalog is a single matrix-vector product.
+    They are float32 by default; pass ``dtype=np.float64`` for exact scores.
+    
+    Search is exact brute force by default. With ``search='ann'`` an IVF
+    index (see ann_index.py) is built and single queries only scan the
+    ``ann_probe`` cells closest to them; ``ann_cells`` sets the number of
+    cells. With ``search='quantized'`` single queries scan a uint8 copy of
+    the unit vectors (see quantized_index.py) and re-score the best
+    ``rerank_candidates`` rows exactly. Batch queries always use exact
+    search.
+    
+    With ``micro_batch=True`` exact single queries from concurrent threads
+    are coalesced (see micro_batch.py): up to ``max_batch_size`` queries
+    arriving within ``batch_wait_ms`` are scored with one matrix product.
+    Results are the same as unbatched up to near-ties (see
+    benchmarks/check_rankings.py); each query waits at most
+    ``batch_wait_ms`` more.
+    
+    If a fresh neighbour graph has been built next to the dataset (see
+    neighbor_graph.py), seed-track queries for up to K results are served
+    from it. Pass ``use_neighbor_graph=False`` to always score live.
+    
+    Artists are encoded as integers at load time (see artist_index.py), so
+    same-artist exclusion, "only this artist" and split multi-artist
+    credits work from per-artist row lists.
+    
+    Results of get_recommendations and get_recommendations_by_features are
+    kept in an LRU cache of ``cache_size`` entries (0 disables it); see
+    cache_stats(). Every mood in MOOD_PRESETS is ranked once at startup, so
+    mood requests are lookups.
+    
+    With ``low_memory=True`` the catalog only keeps the columns the app uses,
+    with repeated strings stored as categoricals (see
+    data.loader.compact_dataset). Returned values are the same, but track
+    dicts only contain those columns.
+    
+    The catalog can be changed while serving with add_tracks,
+    update_tracks and remove_tracks. New tracks are appended to buffers
+    next to the catalog and the feature matrices (see catalog_updates.py)
+    and removed ones are masked out, and both take effect at once. The
+    indexes only cover the tracks present when they were built, so newer
+    tracks are checked directly until enough changes pile up
+    (COMPACT_FRACTION) and compact() merges them and rebuilds the indexes.
+    Queries read ``catalog``; ``df`` merges it into one DataFrame.
+    
+    Concurrency: one instance can be shared by any number of threads.
+    Everything prepared in __init__ is read-only afterwards (its NumPy
+    arrays are marked non-writeable). The only mutable shared state is the
+    result cache and the lazily built autocomplete index, both behind locks.
+    Each thread scores single queries into its own scratch buffer. Catalog
+    updates only append to buffers, replace arrays or write to the removed
+    mask, and run alone: queries hold a readers-writer lock that updates
+    take exclusively.
+    ``blas_threads`` caps BLAS threads per matrix product for the whole
+    process (see limit_blas_threads).
+    
+    save_snapshot writes everything prepared at startup to disk, and
+    load_snapshot restores it by memory-mapping instead of recomputing
+    (see snapshot.py). ``snapshot`` is how load_snapshot passes that
+    state in.
     """
     
-    def __init__(self):
-        self.df = load_full_dataset()
+    # Target audio features of each mood; every preset is ranked at startup
+    MOOD_PRESETS = {
+        'happy': {'valence': 0.8, 'energy': 0.7, 'danceability': 0.7},
+        'sad': {'valence': 0.2, 'energy': 0.3, 'acousticness': 0.6},
+        'energetic': {'energy': 0.9, 'tempo': 140, 'danceability': 0.7},
+        'chill': {'energy': 0.3, 'acousticness': 0.7, 'valence': 0.5},
+        'party': {'danceability': 0.9, 'energy': 0.8, 'valence': 0.7},
+        'focus': {'instrumentalness': 0.7, 'speechiness': 0.05, 'energy': 0.4}
+    }
+    
+    def __init__(self, dtype=np.float32, search='exact', ann_cells=None, ann_probe=8,
+                 use_neighbor_graph=True, low_memory=False, cache_size=DEFAULT_CAPACITY,
+                 rerank_candidates=DEFAULT_CANDIDATES, micro_batch=False,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, batch_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 blas_threads=None, snapshot=None):
+        if search not in ('exact', 'ann', 'quantized'):
+            raise ValueError(f"search must be 'exact', 'ann' or 'quantized', got {search!r}")
         self.feature_columns = get_audio_features_columns()
         self.scaler = MinMaxScaler()
-        self._prepare_features()
+        self.dtype = np.dtype(dtype)
+        self.search = search
+        self.ann_cells = ann_cells
+        self.ann_probe = ann_probe
+        self.rerank_candidates = rerank_candidates
+        self.use_neighbor_graph = use_neighbor_graph
+        self.low_memory = low_memory
+        self.result_cache = ResultCache(cache_size)
+        self.batcher = None
+        self._scratch = threading.local()
+        self._lock = threading.Lock()
+        self._catalog_lock = ReadWriteLock()
+        self._scaled_rows = None
+        self._unit_rows = None
+        self._removed_rows = None
+        if blas_threads is not None:
+            limit_blas_threads(blas_threads)
+        if snapshot is None:
+            self.catalog = Catalog(load_full_dataset(compact=low_memory))
+            self.source_version = get_dataset_version()
+            self.dataset_version = self.source_version
+            self.revision = 0
+            self._prepare_features()
+        else:
+            self._restore(*snapshot)
+        self._freeze()
+        if micro_batch:
+            self.batcher = MicroBatcher(
+                self._score, min(max_batch_size, self.batch_chunk_size()), batch_wait_ms
+            )
+    
+    @property
+    def df(self):
+        """
+        The whole catalog as one DataFrame.
+        
+        Tracks added since the last compaction are merged in on first
+        access after each change, so queries read ``catalog`` instead.
+        """
+        return self.catalog.frame()
     
     def _prepare_features(self):
         """Prepare and scale audio features for similarity calculation."""
-        features = self.df[self.feature_columns].values
-        self.scaled_features = self.scaler.fit_transform(features)
+        scaler_range = load_cached_array('scaler_range', FEATURES_VERSION)
+        scaled_features = load_cached_array('scaled_features', FEATURES_VERSION)
+        if (scaler_range is not None and scaled_features is not None
+                and scaled_features.shape == (len(self.df), len(self.feature_columns))):
+            # Fitting on the stored [min, max] rows restores the exact scaler
+            self.scaler.fit(scaler_range)
+            self.scaled_features = scaled_features
+        else:
+            features = self.df[self.feature_columns].values
+            self.scaled_features = self.scaler.fit_transform(features)
+            save_cached_array(
+                'scaler_range', np.vstack([self.scaler.data_min_, self.scaler.data_max_]),
+                FEATURES_VERSION
+            )
+            save_cached_array('scaled_features', self.scaled_features, FEATURES_VERSION)
+            shared = load_cached_array('scaled_features', FEATURES_VERSION)
+            if shared is not None:
+                self.scaled_features = shared
+        self.unit_features = self._load_unit_features()
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """
+        Build every index over the whole catalog and rank the mood presets.
+        
+        Arrays cached next to the dataset describe the CSV, so they are
+        only reused while the catalog has not been updated.
+        """
+        cached = self.revision == 0
+        self.indexed_rows = len(self.df)
+        self.removed = np.zeros(len(self.df), dtype=bool)
+        self.removed_count = 0
+        self.track_index = {
+            track_id: position
+            for position, track_id in enumerate(self.df['track_id'])
+        }
+        self.artist_index = ArtistIndex(self.df['artists'])
+        self.genre_index = GenreIndex(
+            self.df['genre'], self.df['popularity'].values, self.df[self.feature_columns].values
+        )
+        self.search_index = self._load_search_index(cached)
+        self.prefix_index = None
+        self.ann_index = None
+        if self.search == 'ann':
+            self.ann_index = IVFIndex(self.unit_features, n_cells=self.ann_cells)
+        self.quantized_index = None
+        if self.search == 'quantized':
+            self.quantized_index = self._load_quantized_index(cached)
+        self.neighbor_graph = None
+        if self.use_neighbor_graph and cached:
+            self.neighbor_graph = load_neighbor_graph(
+                len(self.df), self.dtype, self.source_version, FEATURES_VERSION
+            )
+        self._rank_moods()
+    
+    def _rank_moods(self):
+        """Rank the catalog for every mood preset."""
+        self.mood_rankings = {
+            mood: self._rank_vector(self._preset_vector(preset), MOOD_RANK_DEPTH)
+            for mood, preset in self.MOOD_PRESETS.items()
+        }
+    
+    def _freeze(self):
+        """Mark every prepared NumPy array read-only."""
+        owners = [
+            self, self.artist_index, self.genre_index, self.search_index,
+            self.ann_index, self.quantized_index, self.neighbor_graph
+        ]
+        arrays = [array for ranking in self.mood_rankings.values() for array in ranking]
+        for owner in owners:
+            if owner is not None:
+                arrays.extend(vars(owner).values())
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+    
+    @classmethod
+    def load_snapshot(cls, path, verify=True, source_version=None, **options):
+        """
+        Restore a recommender saved with save_snapshot.
+        
+        Nothing is recomputed: arrays are memory-mapped read-only and only
+        the dict lookups over them are rebuilt.
+        
+        Args:
+            path: Snapshot directory
+            verify: Check every snapshot file against its checksum first
+            source_version: Dataset version (see get_dataset_version) the
+                snapshot must have been built from, or None for any
+            **options: MusicRecommender options. Those in SNAPSHOT_OPTIONS
+                default to the snapshot's and must match them; the others
+                apply as usual.
+                
+        Returns:
+            MusicRecommender
+            
+        Raises:
+            SnapshotError: The snapshot is missing, corrupt, of another
+                format version, built differently or by other code (see
+                builder_versions)
+        """
+        meta, frame, state = read_snapshot(path, verify)
+        config = meta['config']
+        for name in SNAPSHOT_OPTIONS:
+            if name not in options:
+                continue
+            value = np.dtype(options[name]).name if name == 'dtype' else options[name]
+            if value != config[name]:
+                raise SnapshotError(f"Snapshot {path} was saved with {name}={config[name]!r}")
+        if source_version is not None and meta['source_version'] != source_version:
+            raise SnapshotError(f"Snapshot {path} was saved from another version of the dataset")
+        if meta.get('builders') != builder_versions(cls.MOOD_PRESETS):
+            raise SnapshotError(f"Snapshot {path} was built by another version of the code")
+        if state['unit_features'].shape != (len(frame), len(get_audio_features_columns())):
+            raise SnapshotError(f"Snapshot {path} does not match its catalog")
+        options.update(config)
+        return cls(snapshot=(meta, frame, state), **options)
+    
+    @_reads_catalog
+    def save_snapshot(self, path):
+        """
+        Save everything prepared at startup to a snapshot directory.
+        
+        The autocomplete index is built first if no query has needed it
+        yet. Pending catalog updates are saved as they are, and the
+        restored recommender serves them the same way.
+        
+        Args:
+            path: Snapshot directory, replaced atomically if it exists
+        """
+        meta = {
+            'config': {
+                'dtype': self.dtype.name, 'search': self.search,
+                'ann_cells': self.ann_cells, 'low_memory': self.low_memory
+            },
+            'source_version': self.source_version,
+            'dataset_version': self.dataset_version,
+            'revision': self.revision,
+            'indexed_rows': self.indexed_rows,
+            'removed_count': self.removed_count,
+            'builders': builder_versions(self.MOOD_PRESETS),
+            'moods': list(self.mood_rankings)
+        }
+        state = {
+            'scaler_range': np.vstack([self.scaler.data_min_, self.scaler.data_max_]),
+            'scaled_features': self.scaled_features,
+            'unit_features': self.unit_features,
+            'removed': self.removed
+        }
+        indexes = {
+            'artist': self.artist_index, 'genre': self.genre_index,
+            'search': self.search_index, 'prefix': self._get_prefix_index(),
+            'ann': self.ann_index
+        }
+        for section, index in indexes.items():
+            if index is not None:
+                state.update((f'{section}.{name}', value) for name, value in index.state().items())
+        if self.quantized_index is not None:
+            index = self.quantized_index
+            state.update({
+                'quantized.codes': index.codes,
+                'quantized.offsets': index.offsets,
+                'quantized.scales': index.scales
+            })
+        for mood, (rows, scores) in self.mood_rankings.items():
+            state[f'mood.{mood}.rows'] = rows
+            state[f'mood.{mood}.scores'] = scores
+        write_snapshot(path, meta, self.df, state)
+    
+    def _restore(self, meta, frame, state):
+        """Take the prepared state from a snapshot (see load_snapshot)."""
+        def section(prefix):
+            prefix += '.'
+            return {
+                name[len(prefix):]: value for name, value in state.items()
+                if name.startswith(prefix)
+            }
+        
+        self.indexed_rows = meta['indexed_rows']
+        self.catalog = Catalog(frame.iloc[:self.indexed_rows])
+        if self.indexed_rows < len(frame):
+            self.catalog = self.catalog.append(frame.iloc[self.indexed_rows:])
+        self.source_version = meta['source_version']
+        self.dataset_version = meta['dataset_version']
+        self.revision = meta['revision']
+        # Fitting on the stored [min, max] rows restores the exact scaler
+        self.scaler.fit(state['scaler_range'])
+        self.scaled_features = state['scaled_features']
+        self.unit_features = state['unit_features']
+        
+        self.removed = state['removed']
+        self.removed_count = meta['removed_count']
+        live = np.flatnonzero(~self.removed)
+        self.track_index = dict(zip(
+            self.catalog.values_at('track_id', live).tolist(), live.tolist()
+        ))
+        self.artist_index = ArtistIndex.from_state(section('artist'))
+        self.genre_index = GenreIndex.from_state(section('genre'))
+        self.search_index = TrigramIndex.from_state(section('search'))
+        indexed = self.catalog.base
+        self.prefix_index = PrefixIndex.from_state(
+            section('prefix'), indexed['track_name'].tolist(), indexed['artists'].tolist()
+        )
+        self.ann_index = None
+        if self.search == 'ann':
+            self.ann_index = IVFIndex.from_state(section('ann'))
+        self.quantized_index = None
+        if self.search == 'quantized':
+            quantized = section('quantized')
+            self.quantized_index = QuantizedIndex(
+                self.unit_features, self.rerank_candidates,
+                (quantized['codes'], quantized['offsets'], quantized['scales'])
+            )
+        self.neighbor_graph = None
+        if self.use_neighbor_graph and self.revision == 0 and self._is_current():
+            self.neighbor_graph = load_neighbor_graph(
+                len(self.catalog), self.dtype, self.source_version, FEATURES_VERSION
+            )
+        self.mood_rankings = {
+            mood: (state[f'mood.{mood}.rows'], state[f'mood.{mood}.scores'])
+            for mood in meta['moods']
+        }
+    
+    def _is_current(self):
+        """Return whether the catalog was loaded from the dataset CSV as it is now."""
+        try:
+            return get_dataset_version() == self.source_version
+        except OSError:
+            return False
     
+    def _load_unit_features(self):
+        """
+        Return the unit-vector matrix, memory-mapped from the dataset cache.
+        
+        The matrix is computed and written to the cache on first use, then
+        mapped read-only so worker processes share one physical copy.
+        """
+        name = f'unit_features_{self.dtype.name}'
+        unit_features = load_cached_array(name, FEATURES_VERSION)
+        if unit_features is not None and unit_features.shape == self.scaled_features.shape:
+            return unit_features
+        
+        unit_features = self._normalize(self.scaled_features)
+        save_cached_array(name, unit_features, FEATURES_VERSION)
+        shared = load_cached_array(name, FEATURES_VERSION)
+        return shared if shared is not None else unit_features
+    
+    def _load_quantized_index(self, cached=True):
+        """Build the uint8 scan index, reusing cached codes if present and allowed."""
+        if not cached:
+            return QuantizedIndex(self.unit_features, self.rerank_candidates)
+        codes_name = f'quantized_codes_{self.dtype.name}'
+        range_name = f'quantized_range_{self.dtype.name}'
+        codes = load_cached_array(codes_name, CODES_VERSION)
+        ranges = load_cached_array(range_name, CODES_VERSION)
+        if codes is not None and ranges is not None and codes.shape[1] == len(self.df):
+            quantized = (codes, ranges[0], ranges[1])
+            return QuantizedIndex(self.unit_features, self.rerank_candidates, quantized)
+        
+        index = QuantizedIndex(self.unit_features, self.rerank_candidates)
+        save_cached_array(codes_name, index.codes, CODES_VERSION)
+        save_cached_array(
+            range_name, np.vstack([index.offsets, index.scales]), CODES_VERSION
+        )
+        return index
+    
+    def _load_search_index(self, cached=True):
+        """Build the trigram search index, reusing cached postings if present and allowed."""
+        if not cached:
+            return TrigramIndex(self.df['track_name'].tolist(), self.df['artists'].tolist())
+        names = ('search_keys', 'search_offsets', 'search_rows')
+        postings = tuple(load_cached_array(name, POSTINGS_VERSION) for name in names)
+        if any(array is None for array in postings):
+            postings = None
+        
+        index = TrigramIndex(
+            self.df['track_name'].tolist(), self.df['artists'].tolist(), postings
+        )
+        if postings is None:
+            for name, array in zip(names, (index.keys, index.offsets, index.rows)):
+                save_cached_array(name, array, POSTINGS_VERSION)
+        return index
+    
+    def _normalize(self, vectors):
+        """Return L2-normalized rows as a contiguous array of ``self.dtype``."""
+        vectors = np.asarray(vectors, dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1
+        return np.ascontiguousarray(vectors / norms, dtype=self.dtype)
+    
+    def lookup(self, track_id):
+        """Return the row position of a track ID, or None if it is unknown."""
+        return self.track_index.get(str(track_id))
+    
+    def lookup_many(self, track_ids):
+        """
+        Return the row positions of several track IDs as a NumPy array.
+        
+        Unknown IDs map to -1.
+        """
+        track_ids = list(track_ids)
+        return np.fromiter(
+            (self.track_index.get(str(track_id), -1) for track_id in track_ids),
+            dtype=np.intp,
+            count=len(track_ids)
+        )
+    
+    @_reads_catalog
     def get_all_tracks(self):
         """Return all tracks in the dataset."""
-        return self.df[['track_id', 'track_name', 'artists', 'album_name', 
-                        'popularity', 'genre']].to_dict('records')
+        return gather(self.catalog, self._live(np.arange(len(self.catalog))), LISTING_COLUMNS)
     
+    @_reads_catalog
     def get_popular_tracks(self, n_tracks=200):
         """Return the most popular tracks for initial display."""
-        popular = self.df.nlargest(n_tracks, 'popularity')
-        return popular[['track_id', 'track_name', 'artists', 'album_name', 
-                        'popularity', 'genre']].to_dict('records')
+        popularity = pd.Series(self.catalog.column('popularity'), copy=False)
+        if self.removed_count:
+            popularity = popularity[~self.removed]
+        popular = popularity.nlargest(n_tracks).index
+        return gather(self.catalog, popular, LISTING_COLUMNS)
     
+    @_reads_catalog
     def get_track_by_id(self, track_id):
         """Get a single track by its ID."""
-        track = self.df[self.df['track_id'] == str(track_id)]
-        if len(track) > 0:
-            return track.iloc[0].to_dict()
-        return None
+        idx = self.lookup(track_id)
+        if idx is None:
+            return None
+        return gather(self.catalog, [idx])[0]
     
+    @_reads_catalog
     def get_track_features(self, track_id):
         """Get audio features for a specific track."""
-        track = self.df[self.df['track_id'] == str(track_id)]
-        if len(track) > 0:
-            features = track[self.feature_columns].iloc[0].to_dict()
-            return features
-        return None
+        idx = self.lookup(track_id)
+        if idx is None:
+            return None
+        return gather(self.catalog, [idx], self.feature_columns)[0]
     
-    def get_recommendations(self, track_id, n_recommendations=10, exclude_same_artist=False):
+    @_reads_catalog
+    def get_recommendations(self, track_id, n_recommendations=10, exclude_same_artist=False,
+                            same_artist_only=False, split_artists=False, columns=None,
+                            columnar=False):
         """
         Get song recommendations based on a seed track.
         Computes similarity on-demand for memory efficiency with large datasets.
@@ -77,52 +638,331 @@ class MusicRecommender:
             track_id: The ID of the seed track
             n_recommendations: Number of recommendations to return
             exclude_same_artist: Whether to exclude songs by the same artist
+            same_artist_only: Whether to only recommend songs by the same artist
+            split_artists: Treat a multi-artist credit such as "A;B" as
+                separate artists, so any shared artist counts as the same
+                artist (by default the whole credit must match)
+            columns: Track fields to include (all when None; CARD_COLUMNS
+                has what the app renders)
+            columnar: Return one array per field instead of track dicts
             
         Returns:
             List of recommended tracks with similarity scores
         """
-        try:
-            idx = self.df[self.df['track_id'] == str(track_id)].index[0]
-        except IndexError:
-            return []
+        if exclude_same_artist and same_artist_only:
+            raise ValueError("exclude_same_artist and same_artist_only are mutually exclusive")
+        key = (
+            'seed', str(track_id), int(n_recommendations),
+            bool(exclude_same_artist), bool(same_artist_only), bool(split_artists)
+        )
+        top_indices, top_scores = self._cached(key, lambda: self._rank_for_seed(
+            track_id, n_recommendations, exclude_same_artist, same_artist_only, split_artists
+        ))
+        return self._build_recommendations(top_indices, top_scores, columns, columnar)
+    
+    def _rank_for_seed(self, track_id, n_recommendations, exclude_same_artist,
+                       same_artist_only, split_artists):
+        """
+        Rank recommendations for a seed track without the result cache.
+        
+        Returns:
+            Tuple of (row positions, similarity scores), best first
+        """
+        idx = self.lookup(track_id)
+        if idx is None:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=self.dtype)
         
-        seed_features = self.scaled_features[idx].reshape(1, -1)
-        similarities = cosine_similarity(seed_features, self.scaled_features)[0]
-        
-        if exclude_same_artist:
-            seed_artist = self.df.iloc[idx]['artists']
-            mask = self.df['artists'] != seed_artist
-            mask[idx] = False
-            valid_indices = np.where(mask)[0]
-            valid_similarities = similarities[valid_indices]
-            top_indices_local = np.argsort(valid_similarities)[::-1][:n_recommendations]
-            top_indices = valid_indices[top_indices_local]
-            top_scores = valid_similarities[top_indices_local]
+        if same_artist_only:
+            # Only the artist's own rows are scored
+            positions = self._related_rows(idx, split_artists)
+            similarities = self._score_rows(self.unit_features[idx], positions)
+            return self._rank_seed(idx, similarities, n_recommendations, False, positions)
+        
+        if (self.neighbor_graph is not None and not split_artists
+                and n_recommendations <= self.neighbor_graph.k):
+            return self.neighbor_graph.get(idx, n_recommendations, exclude_same_artist)
+        
+        # The seed, removed rows and maybe the artist's rows are dropped
+        # from the candidates, so approximate search must keep that many more
+        excluded = 1 + self.removed_count
+        if exclude_same_artist and self.search != 'exact':
+            excluded += len(self._related_rows(idx, split_artists))
+        positions, similarities = self._search(
+            self.unit_features[idx], n_recommendations + excluded
+        )
+        return self._rank_seed(
+            idx, similarities, n_recommendations, exclude_same_artist, positions, split_artists
+        )
+    
+    def _related_rows(self, idx, split_artists=False):
+        """
+        Return the sorted rows sharing an artist with a row (the row included).
+        
+        Rows added since the indexes were built have their credits compared
+        directly.
+        """
+        if self.indexed_rows == len(self.catalog):
+            return self.artist_index.related_rows(idx, split_artists)
+        credit = str(self.catalog.values_at('artists', [idx])[0])
+        if idx < self.indexed_rows:
+            rows = self.artist_index.related_rows(idx, split_artists)
         else:
-            similarities[idx] = -1
-            top_indices = np.argsort(similarities)[::-1][:n_recommendations]
-            top_scores = similarities[top_indices]
+            rows = self.artist_index.rows_of_credit(credit, split_artists)
+        credits = self.catalog.appended_column('artists')
+        related = (credits == credit).to_numpy(dtype=bool)
+        if split_artists:
+            related = related | credits_naming(credits, split_credit(credit))
+        return np.concatenate([rows, self._appended_where(related)])
+    
+    @_reads_catalog
+    def browse_artist(self, artist):
+        """
+        Get every track crediting an artist, including multi-artist credits.
+        
+        Returns:
+            TrackResults in catalog order (empty for an unknown artist)
+        """
+        artist_id = self.artist_index.lookup(artist)
+        rows = np.empty(0, dtype=np.int32)
+        if artist_id is not None:
+            rows = self.artist_index.artist_rows_of(artist_id)
+        if self.indexed_rows < len(self.catalog):
+            credits = self.catalog.appended_column('artists')
+            appended = self._appended_where(credits_naming(credits, [str(artist).strip()]))
+            rows = np.concatenate([rows, appended])
+        return TrackResults(self.catalog, self._live(rows))
+    
+    @_reads_catalog
+    def get_recommendations_batch(self, track_ids, n_recommendations=10,
+                                  exclude_same_artist=False, chunk_size=None, columns=None):
+        """
+        Get song recommendations for many seed tracks at once.
+        Seeds are scored in chunks with one matrix-matrix product per chunk,
+        sized so the similarity buffer stays within BATCH_MEMORY_BYTES.
         
-        recommendations = []
-        for i, track_idx in enumerate(top_indices):
-            track = self.df.iloc[track_idx].to_dict()
-            track['similarity_score'] = round(top_scores[i] * 100, 1)
-            recommendations.append(track)
+        Args:
+            track_ids: The IDs of the seed tracks
+            n_recommendations: Number of recommendations per seed
+            exclude_same_artist: Whether to exclude songs by the seed's artist
+            chunk_size: Seeds scored per matrix product (derived from the
+                memory budget when None)
+            columns: Track fields to include (all when None)
+            
+        Returns:
+            One list of recommended tracks per seed, in input order. Each list
+            matches get_recommendations for that seed up to near-ties (see
+            benchmarks/check_rankings.py); unknown IDs give [].
+        """
+        positions = self.lookup_many(track_ids)
+        results = [[] for _ in range(len(positions))]
+        slots = np.flatnonzero(positions >= 0)
+        chunk_size = chunk_size or self.batch_chunk_size()
+        
+        for start in range(0, len(slots), chunk_size):
+            chunk = slots[start:start + chunk_size]
+            ranked = self._rank_batch(positions[chunk], n_recommendations, exclude_same_artist)
+            
+            # Materialize the whole chunk in one pass, then split per seed
+            records = self._build_recommendations(
+                np.concatenate([top_indices for top_indices, _ in ranked]),
+                np.concatenate([top_scores for _, top_scores in ranked]),
+                columns
+            )
+            offset = 0
+            for slot, (top_indices, _) in zip(chunk, ranked):
+                results[slot] = records[offset:offset + len(top_indices)]
+                offset += len(top_indices)
         
-        return recommendations
+        return results
     
-    def get_recommendations_by_features(self, features_dict, n_recommendations=10):
+    def batch_chunk_size(self):
+        """Number of seeds per chunk that keeps scores within BATCH_MEMORY_BYTES."""
+        row_bytes = max(len(self.catalog) * self.dtype.itemsize, 1)
+        return max(BATCH_MEMORY_BYTES // row_bytes, 2)
+    
+    def _rank_batch(self, seeds, n_recommendations, exclude_same_artist):
+        """
+        Score a chunk of seed rows with one matrix product and rank each.
+        
+        Returns:
+            List of (row positions, similarity scores) tuples, one per seed
+        """
+        scores = self._score(self.unit_features[seeds])
+        return [
+            self._rank_seed(seed, scores[row], n_recommendations, exclude_same_artist)
+            for row, seed in enumerate(seeds)
+        ]
+    
+    def _score(self, queries):
+        """
+        Cosine similarity of query unit vectors against every track.
+        
+        Returns:
+            Array of shape (n_queries, n_tracks)
+        """
+        return np.atleast_2d(queries) @ self.unit_features.T
+    
+    def _score_one(self, query):
+        """
+        Score one query into this thread's scratch buffer.
+        
+        A matrix-vector product may round differently from the batch
+        product in _score, so scores can differ in the last bits and
+        near-ties may swap (see benchmarks/check_rankings.py). The returned
+        scores are only valid until the same thread scores again, so
+        callers must copy what they keep.
+        """
+        buffer = getattr(self._scratch, 'scores', None)
+        if buffer is None or buffer.shape[0] != self.unit_features.shape[0]:
+            buffer = np.empty(self.unit_features.shape[0], dtype=self.dtype)
+            self._scratch.scores = buffer
+        np.matmul(self.unit_features, query, out=buffer)
+        return buffer
+    
+    def _score_rows(self, query, rows):
+        """Cosine similarity of one query unit vector against some rows."""
+        return self.unit_features[rows] @ query
+    
+    def _search(self, query, min_candidates=0):
+        """
+        Score a query unit vector with the configured search mode.
+        
+        Args:
+            query: Unit vector
+            min_candidates: Rows approximate search scores at least: the
+                results wanted plus every row the caller may drop
+                
+        Returns:
+            Tuple of (row positions, similarities). Positions are None when
+            every track was scored, so similarities are indexed by row.
+        """
+        if self.quantized_index is not None:
+            return self._with_appended(
+                query, *self.quantized_index.search(query, min_candidates)
+            )
+        if self.ann_index is not None:
+            return self._with_appended(
+                query, *self.ann_index.search(query, self.ann_probe, min_candidates)
+            )
+        if self.batcher is not None:
+            return None, self.batcher.score(query)
+        return None, self._score_one(query)
+    
+    def _with_appended(self, query, positions, similarities):
+        """Add exact scores for the rows appended since the vector index was built."""
+        if self.indexed_rows == len(self.catalog):
+            return positions, similarities
+        appended = self._appended_rows()
+        return (
+            np.concatenate([positions, appended]),
+            np.concatenate([similarities, self._score_rows(query, appended)])
+        )
+    
+    def _rank_seed(self, idx, similarities, n_recommendations, exclude_same_artist,
+                   positions=None, split_artists=False):
+        """
+        Pick the top rows for a seed track, leaving out the seed itself.
+        
+        Same-artist exclusion only masks the rows on the artist's posting
+        list (see ArtistIndex) instead of comparing every row's artist.
+        Removed rows are masked too.
+        
+        Returns:
+            Tuple of (row positions, similarity scores), best first
+        """
+        if positions is None:
+            similarities[idx] = -np.inf
+            exclude = None
+            if exclude_same_artist:
+                exclude = self._related_rows(idx, split_artists)
+            if self.removed_count:
+                similarities[self.removed] = -np.inf
+        else:
+            exclude = positions == idx
+            if exclude_same_artist and self.indexed_rows == len(self.catalog):
+                exclude |= self.artist_index.shares_artist(positions, idx, split_artists)
+            elif exclude_same_artist:
+                exclude |= np.isin(positions, self._related_rows(idx, split_artists))
+            if self.removed_count:
+                exclude |= self.removed[positions]
+        
+        top = select_top_k(similarities, n_recommendations, exclude)
+        top_indices = top if positions is None else positions[top]
+        return top_indices, similarities[top]
+    
+    @_reads_catalog
+    def measure_ann_recall(self, k=10, n_queries=200, seed=0):
+        """
+        Measure recall@k of the approximate search mode against exact search.
+        
+        Args:
+            k: Number of neighbours compared per query
+            n_queries: Number of random seed tracks to query
+            seed: Random seed for picking query tracks
+            
+        Returns:
+            Mean fraction of the exact top-k found by the approximate search
+        """
+        if self.search == 'exact':
+            raise ValueError("Approximate search is not enabled; use search='ann' or 'quantized'")
+        
+        rng = np.random.default_rng(seed)
+        queries = rng.choice(len(self.catalog), min(n_queries, len(self.catalog)), replace=False)
+        hits = 0
+        for idx in queries:
+            query = self.unit_features[idx]
+            exact, _ = self._rank_seed(idx, self._score_one(query), k, False)
+            positions, similarities = self._search(query, k + 1 + self.removed_count)
+            approx, _ = self._rank_seed(idx, similarities, k, False, positions)
+            hits += len(np.intersect1d(exact, approx))
+        return hits / (len(queries) * k)
+    
+    def _build_recommendations(self, top_indices, top_scores, columns=None, columnar=False):
+        """
+        Turn ranked row positions and their scores into track dicts.
+        
+        Args:
+            top_indices: Row positions, best first
+            top_scores: Cosine similarities of those rows
+            columns: Track fields to include (all when None)
+            columnar: Return one array per field instead of track dicts
+            
+        Returns:
+            List of track dicts with a similarity_score percentage, or a dict
+            of field name to array when columnar is true
+        """
+        scores = [round(float(score) * 100, 1) for score in top_scores]
+        return gather(
+            self.catalog, top_indices, columns,
+            extra={'similarity_score': np.array(scores, dtype=np.float64)},
+            columnar=columnar
+        )
+    
+    @_reads_catalog
+    def get_recommendations_by_features(self, features_dict, n_recommendations=10,
+                                        columns=None, columnar=False):
         """
         Get recommendations based on custom audio feature preferences.
         
         Args:
             features_dict: Dictionary of audio features (danceability, energy, etc.)
             n_recommendations: Number of recommendations to return
+            columns: Track fields to include (all when None)
+            columnar: Return one array per field instead of track dicts
             
         Returns:
             List of recommended tracks
         """
-        feature_vector = np.array([[
+        feature_vector = self._preset_vector(features_dict)
+        key = ('features', tuple(feature_vector[0].tolist()), int(n_recommendations))
+        top_indices, top_scores = self._cached(
+            key, lambda: self._rank_vector(feature_vector, n_recommendations)
+        )
+        return self._build_recommendations(top_indices, top_scores, columns, columnar)
+    
+    def _preset_vector(self, features_dict):
+        """Return a (1, n_features) vector, filling in default feature values."""
+        return np.array([[
             features_dict.get('danceability', 0.5),
             features_dict.get('energy', 0.5),
             features_dict.get('loudness', -10),
@@ -133,44 +973,169 @@ class MusicRecommender:
             features_dict.get('valence', 0.5),
             features_dict.get('tempo', 120)
         ]])
+    
+    def _rank_vector(self, feature_vector, n_recommendations):
+        """
+        Rank the catalog against an unscaled feature vector.
         
-        scaled_vector = self.scaler.transform(feature_vector)
-        similarities = cosine_similarity(scaled_vector, self.scaled_features)[0]
+        Returns:
+            Tuple of (row positions, similarity scores), best first
+        """
+        scaled_vector = self._normalize(self.scaler.transform(feature_vector)[0])
+        positions, similarities = self._search(
+            scaled_vector, n_recommendations + self.removed_count
+        )
         
-        top_indices = np.argsort(similarities)[::-1][:n_recommendations]
+        exclude = None
+        if self.removed_count:
+            exclude = self.removed if positions is None else self.removed[positions]
+        top = select_top_k(similarities, n_recommendations, exclude)
+        top_indices = top if positions is None else positions[top]
+        return top_indices, similarities[top]
+    
+    def _cached(self, key, compute):
+        """
+        Serve a ranking from the LRU cache, keyed with the dataset version.
         
-        recommendations = []
-        for idx in top_indices:
-            track = self.df.iloc[idx].to_dict()
-            track['similarity_score'] = round(similarities[idx] * 100, 1)
-            recommendations.append(track)
+        Rankings are (rows, scores) arrays, stored read-only since every
+        thread shares them.
+        """
+        def compute_frozen():
+            ranking = compute()
+            for array in ranking:
+                array.setflags(write=False)
+            return ranking
         
-        return recommendations
+        return self.result_cache.get_or_compute((self.dataset_version,) + key, compute_frozen)
     
+    def cache_stats(self):
+        """Return the result cache's hit, miss and eviction counters."""
+        return self.result_cache.stats()
+    
+    @_reads_catalog
     def get_tracks_by_genre(self, genre, n_tracks=20):
         """Get tracks filtered by genre."""
-        genre_tracks = self.df[self.df['genre'] == genre.lower()]
-        return genre_tracks.head(n_tracks).to_dict('records')
+        return self.browse_genre(genre, by_popularity=False).slice(0, n_tracks)
+    
+    @_reads_catalog
+    def browse_genre(self, genre, by_popularity=True, columns=None):
+        """
+        Get every track of a genre as a paginated result handle.
+        
+        Args:
+            genre: Genre name (case-insensitive)
+            by_popularity: Most popular first instead of catalog order
+            columns: Track fields to include (all when None)
+            
+        Returns:
+            TrackResults backed by the precomputed genre index, so reading a
+            page costs O(page size)
+        """
+        genre = genre.lower()
+        rows = self.genre_index.rows_of(genre, by_popularity)
+        if self.indexed_rows < len(self.catalog):
+            genres = self.catalog.appended_column('genre')
+            appended = self._appended_where((genres == genre).to_numpy(dtype=bool))
+            rows = np.concatenate([rows, appended])
+            if by_popularity:
+                rows = rows[np.lexsort((rows, -self.catalog.values_at('popularity', rows)))]
+        return TrackResults(self.catalog, self._live(rows), columns)
     
+    @_reads_catalog
     def get_genre_stats(self):
         """Get statistics for each genre."""
-        stats = self.df.groupby('genre')[self.feature_columns].mean()
-        return stats.to_dict('index')
+        index = self.genre_index
+        return {
+            genre: dict(zip(self.feature_columns, centroid.tolist()))
+            for genre, count, centroid in zip(index.genres, index.counts, index.centroids)
+            if count
+        }
     
+    @_reads_catalog
+    def get_genre_counts(self):
+        """Return the number of tracks in each genre."""
+        index = self.genre_index
+        return {genre: count for genre, count in zip(index.genres, index.counts.tolist()) if count}
+    
+    @_reads_catalog
     def get_all_genres(self):
         """Return list of all unique genres."""
-        return sorted(self.df['genre'].unique().tolist())
-    
-    def search_tracks(self, query):
-        """Search for tracks by name or artist."""
-        query = query.lower()
-        mask = (
-            self.df['track_name'].str.lower().str.contains(query, na=False) |
-            self.df['artists'].str.lower().str.contains(query, na=False)
-        )
-        return self.df[mask].to_dict('records')
+        index = self.genre_index
+        return [genre for genre, count in zip(index.genres, index.counts) if count]
     
-    def get_mood_based_recommendations(self, mood, n_recommendations=10):
+    @_reads_catalog
+    def search_tracks(self, query, columns=None):
+        """
+        Search for tracks by name or artist.
+        Matches the query as a literal, case-insensitive substring using the
+        trigram index built at load time.
+        
+        Args:
+            query: Text to search for
+            columns: Track fields to include (all when None)
+            
+        Returns:
+            TrackResults in catalog order. It acts like a list of track
+            dicts, but only the pages or slices that are read get built.
+        """
+        rows = self.search_index.search(query)
+        if self.indexed_rows < len(self.catalog) or self.removed_count:
+            text = query.lower()
+            found = np.zeros(len(self.catalog) - self.indexed_rows, dtype=bool)
+            for column in ('track_name', 'artists'):
+                values = self.catalog.appended_column(column).str.lower()
+                found |= values.str.contains(text, regex=False).to_numpy(dtype=bool)
+            rows = self._live(np.concatenate([rows, self._appended_where(found)]))
+        return TrackResults(self.catalog, rows, columns)
+    
+    @_reads_catalog
+    def autocomplete(self, query, n=100):
+        """
+        Suggest seed tracks for a partially typed song or artist name.
+        Matches the query against the start of any word in the track name or
+        artists, so "blind", "lights" and "the weeknd" all work. The prefix
+        index is built on first use.
+        
+        Args:
+            query: Text typed so far
+            n: Maximum number of suggestions
+            
+        Returns:
+            List of track dicts (track_id, track_name, artists, popularity),
+            most popular first
+        """
+        prefix_index = self._get_prefix_index()
+        if self.indexed_rows == len(self.catalog) and not self.removed_count:
+            rows = prefix_index.complete(query, n)
+        else:
+            # Ask for enough indexed rows to make up for removed ones
+            rows = self._live(prefix_index.complete(query, n + self.removed_count))
+            text = normalize(query)
+            if text:
+                catalog = self.catalog
+                found = (matching(text, catalog.appended_column('track_name'))
+                         | matching(text, catalog.appended_column('artists')))
+                rows = np.concatenate([rows, self._live(self._appended_where(found))])
+                rows = rows[np.lexsort((rows, -catalog.values_at('popularity', rows)))]
+            rows = rows[:n]
+        return gather(self.catalog, rows, ['track_id', 'track_name', 'artists', 'popularity'])
+    
+    def _get_prefix_index(self):
+        """Return the autocomplete index over the indexed rows, building it on first use."""
+        if self.prefix_index is None:
+            with self._lock:
+                if self.prefix_index is None:
+                    indexed = self.catalog.base
+                    self.prefix_index = PrefixIndex(
+                        indexed['track_name'].tolist(),
+                        indexed['artists'].tolist(),
+                        indexed['popularity'].values
+                    )
+        return self.prefix_index
+    
+    @_reads_catalog
+    def get_mood_based_recommendations(self, mood, n_recommendations=10, columns=None,
+                                       columnar=False):
         """
         Get recommendations based on mood presets.
         
@@ -181,23 +1146,272 @@ class MusicRecommender:
         - chill: Low energy, high acousticness
         - party: High danceability, high energy
         - focus: High instrumentalness, low speechiness
-        """
-        mood_presets = {
-            'happy': {'valence': 0.8, 'energy': 0.7, 'danceability': 0.7},
-            'sad': {'valence': 0.2, 'energy': 0.3, 'acousticness': 0.6},
-            'energetic': {'energy': 0.9, 'tempo': 140, 'danceability': 0.7},
-            'chill': {'energy': 0.3, 'acousticness': 0.7, 'valence': 0.5},
-            'party': {'danceability': 0.9, 'energy': 0.8, 'valence': 0.7},
-            'focus': {'instrumentalness': 0.7, 'speechiness': 0.05, 'energy': 0.4}
-        }
         
-        if mood.lower() not in mood_presets:
+        columns and columnar work as in get_recommendations.
+        """
+        mood = mood.lower()
+        if mood not in self.MOOD_PRESETS:
             return []
         
-        preset = mood_presets[mood.lower()]
-        return self.get_recommendations_by_features(preset, n_recommendations)
+        # Rankings were computed at startup; deeper requests score live
+        if mood in self.mood_rankings and n_recommendations <= MOOD_RANK_DEPTH:
+            n = max(int(n_recommendations), 0)
+            top_indices, top_scores = self.mood_rankings[mood]
+            return self._build_recommendations(
+                top_indices[:n], top_scores[:n], columns, columnar
+            )
+        return self.get_recommendations_by_features(
+            self.MOOD_PRESETS[mood], n_recommendations, columns, columnar
+        )
+    
+    def add_tracks(self, tracks):
+        """
+        Add tracks to the live catalog without rebuilding it.
+        
+        New tracks are appended to the catalog and the feature matrices and
+        every query sees them at once. The scaler is refitted, and every
+        track re-scaled, only when a new track falls outside its fitted
+        feature range.
+        
+        Args:
+            tracks: Track dicts (or a DataFrame) with a track_id and every
+                audio feature; other fields get the loader's defaults
+                
+        Returns:
+            Number of tracks added
+        """
+        new = prepare_tracks(tracks, self.catalog.base)
+        if not len(new):
+            return 0
+        with self._catalog_lock.writing():
+            known = [track_id for track_id in new['track_id'] if track_id in self.track_index]
+            if known:
+                raise ValueError(f"Tracks already in the catalog: {', '.join(known[:5])}")
+            self._commit(self._append(new), len(new))
+        return len(new)
+    
+    def update_tracks(self, tracks):
+        """
+        Change fields of tracks in the live catalog.
+        
+        An updated track is removed and added again, so it moves to the end
+        of the catalog order.
+        
+        Args:
+            tracks: Dicts with a track_id and the fields to change
+            
+        Returns:
+            Number of tracks updated
+        """
+        with self._catalog_lock.writing():
+            records = {}
+            for fields in tracks:
+                track_id = str(fields['track_id'])
+                if track_id not in records:
+                    idx = self.track_index.get(track_id)
+                    if idx is None:
+                        raise ValueError(f"Unknown track {track_id!r}")
+                    records[track_id] = gather(self.catalog, [idx])[0]
+                records[track_id].update(fields, track_id=track_id)
+            if not records:
+                return 0
+            new = prepare_tracks(list(records.values()), self.catalog.base)
+            self._remove([self.track_index[track_id] for track_id in records])
+            self._commit(self._append(new), len(new))
+        return len(records)
+    
+    def remove_tracks(self, track_ids):
+        """
+        Remove tracks from the live catalog.
+        
+        Removed tracks leave every result at once; their rows are dropped
+        when the catalog is next compacted.
+        
+        Returns:
+            Number of tracks removed (unknown IDs are ignored)
+        """
+        with self._catalog_lock.writing():
+            rows = list(dict.fromkeys(
+                self.track_index[track_id] for track_id in map(str, track_ids)
+                if track_id in self.track_index
+            ))
+            if not rows:
+                return 0
+            self._remove(rows)
+            self._commit()
+        return len(rows)
+    
+    def compact(self):
+        """Drop removed tracks and rebuild every index over the catalog now."""
+        with self._catalog_lock.writing():
+            self._commit(rebuild=True)
+    
+    def _append(self, new):
+        """
+        Append prepared tracks to the catalog and the feature matrices.
+        
+        Returns:
+            Whether the scaler range grew, so every index must be rebuilt
+        """
+        features = new[self.feature_columns].values.astype(np.float64)
+        start = len(self.catalog)
+        self.catalog = self.catalog.append(new)
+        if self._removed_rows is None:
+            self._removed_rows = AppendBuffer(self.removed)
+        self.removed = self._removed_rows.append(np.zeros(len(new), dtype=bool))
+        self.track_index.update(zip(new['track_id'], range(start, len(self.catalog))))
+        self.genre_index.update_stats(new['genre'], features)
+        
+        lower = np.minimum(self.scaler.data_min_, features.min(axis=0))
+        upper = np.maximum(self.scaler.data_max_, features.max(axis=0))
+        if (lower < self.scaler.data_min_).any() or (upper > self.scaler.data_max_).any():
+            self._rescale(lower, upper)
+            return True
+        
+        if self._unit_rows is None:
+            self._scaled_rows = AppendBuffer(self.scaled_features)
+            self._unit_rows = AppendBuffer(self.unit_features)
+        scaled = self.scaler.transform(features)
+        self.scaled_features = self._scaled_rows.append(scaled)
+        self.unit_features = self._unit_rows.append(self._normalize(scaled))
+        return False
+    
+    def _rescale(self, lower, upper):
+        """Refit the scaler to a wider feature range and re-scale every track."""
+        self.scaler = MinMaxScaler().fit(np.vstack([lower, upper]))
+        self.scaled_features = self.scaler.transform(self.df[self.feature_columns].values)
+        self.unit_features = self._normalize(self.scaled_features)
+        self._scaled_rows = None
+        self._unit_rows = None
+    
+    def _remove(self, rows):
+        """Mask rows out and take them off the id index and genre statistics."""
+        rows = np.asarray(rows, dtype=np.intp)
+        if self._removed_rows is None:
+            self._removed_rows = AppendBuffer(self.removed)
+            self.removed = self._removed_rows.view()
+        # Queries are held off by the write lock, so the mask changes in place
+        self._removed_rows.assign(rows, True)
+        self.removed_count += len(rows)
+        for track_id in self.catalog.values_at('track_id', rows).tolist():
+            del self.track_index[track_id]
+        features = np.column_stack([
+            self.catalog.values_at(column, rows) for column in self.feature_columns
+        ])
+        self.genre_index.update_stats(self.catalog.values_at('genre', rows), features, -1)
+    
+    def _commit(self, rebuild=False, added=0):
+        """
+        Publish a catalog change made under the write lock.
+        
+        Cached results and the neighbour graph no longer apply. The indexes
+        are rebuilt when asked to, or once the rows they do not cover pass
+        COMPACT_FRACTION of the catalog; otherwise the mood rankings are
+        brought up to date (see _update_moods).
+        
+        Args:
+            rebuild: Rebuild every index now
+            added: Number of tracks this change appended
+        """
+        self.revision += 1
+        self.dataset_version = f"{self.source_version}+{self.revision}"
+        self.result_cache.clear()
+        self.neighbor_graph = None
+        pending = len(self.catalog) - self.indexed_rows + self.removed_count
+        if rebuild or pending > max(COMPACT_MIN_ROWS, self.indexed_rows * COMPACT_FRACTION):
+            self._compact()
+        else:
+            self._update_moods(np.arange(len(self.catalog) - added, len(self.catalog)))
+        self._freeze()
+    
+    def _update_moods(self, rows):
+        """
+        Bring the mood rankings up to date after tracks were added or removed.
+        
+        A ranking that lost a track is ranked again over the whole catalog,
+        since the next best tracks are not stored, and so is a preset that
+        has no ranking yet. Otherwise only the new rows are scored and
+        merged in, ties going to the earlier row as in a full ranking.
+        
+        Args:
+            rows: Rows appended by the change
+        """
+        rankings = {}
+        for mood, preset in self.MOOD_PRESETS.items():
+            ranking = self.mood_rankings.get(mood)
+            if ranking is None or self.removed[ranking[0]].any():
+                rankings[mood] = self._rank_vector(self._preset_vector(preset), MOOD_RANK_DEPTH)
+                continue
+            top_rows, top_scores = ranking
+            if not len(rows):
+                rankings[mood] = (top_rows, top_scores)
+                continue
+            query = self._normalize(self.scaler.transform(self._preset_vector(preset))[0])
+            candidates = np.concatenate([top_rows, rows])
+            scores = np.concatenate([top_scores, self._score_rows(query, rows)])
+            order = np.argsort(candidates, kind='stable')
+            candidates, scores = candidates[order], scores[order]
+            top = select_top_k(scores, MOOD_RANK_DEPTH)
+            rankings[mood] = (candidates[top], scores[top])
+        self.mood_rankings = rankings
+    
+    def _compact(self):
+        """Merge the appended tracks, drop removed rows and rebuild every index."""
+        frame = self.catalog.frame()
+        live = np.flatnonzero(~self.removed)
+        if len(live) < len(frame):
+            frame = frame.iloc[live].reset_index(drop=True)
+        self.catalog = Catalog(frame)
+        # Indexing copies, which also releases the append buffers' spare rows
+        self.scaled_features = self.scaled_features[live]
+        self.unit_features = self.unit_features[live]
+        self._scaled_rows = None
+        self._unit_rows = None
+        self._removed_rows = None
+        self._build_indexes()
+    
+    def _appended_rows(self):
+        """Return the rows added since the indexes were built, removed or not."""
+        return np.arange(self.indexed_rows, len(self.catalog))
+    
+    def _appended_where(self, mask):
+        """
+        Return the appended rows where a mask over them is set.
+        
+        There are few appended rows until the next compaction, so queries
+        filter them with vectorized comparisons over their columns (see
+        Catalog.appended_column) instead of through an index.
+        """
+        return self.indexed_rows + np.flatnonzero(mask)
+    
+    def _live(self, rows):
+        """Drop removed rows from an array of row positions."""
+        rows = np.asarray(rows)
+        return rows[~self.removed[rows]] if self.removed_count else rows
 
 
-def create_recommender():
-    """Factory function to create a MusicRecommender instance."""
-    return MusicRecommender()
+def create_recommender(snapshot_path=None, **kwargs):
+    """
+    Factory function to create a MusicRecommender instance.
+    
+    Restores the snapshot at ``snapshot_path`` (the dataset's default
+    snapshot path when None) if it is intact, was saved from the current
+    dataset CSV, with the same SNAPSHOT_OPTIONS and by the same code (see
+    builder_versions); otherwise prepares the recommender from the
+    dataset. Without the CSV any intact snapshot built by this code is
+    used.
+    """
+    path = snapshot_path or default_snapshot_path()
+    if os.path.isdir(path):
+        try:
+            source_version = get_dataset_version()
+        except OSError:
+            source_version = None
+        parameters = inspect.signature(MusicRecommender).parameters
+        options = {name: parameters[name].default for name in SNAPSHOT_OPTIONS}
+        options.update(kwargs)
+        try:
+            return MusicRecommender.load_snapshot(path, source_version=source_version, **options)
+        except SnapshotError:
+            pass
+    return MusicRecommender(**kwargs)
@@ -0,0 +1,79 @@
+"""
+Bounded LRU cache for recommendation results.
+
+Streamlit reruns the whole script on every widget change, so the same
+recommendation queries arrive again and again. Results are cached under a
+key built from the normalized query parameters and the dataset version.
+The recommender caches rankings as read-only (rows, scores) arrays and
+builds fresh track dicts from them on every call, so mutating a result
+never changes what the cache holds.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 256
+
+
+class ResultCache:
+    """Thread-safe least-recently-used cache of immutable values."""
+    
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Maximum number of cached results (0 disables caching)
+        """
+        self.capacity = max(int(capacity), 0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for a key, computing and storing it on a miss.
+        
+        Args:
+            key: Hashable key of normalized query parameters
+            compute: Zero-argument callable returning the value, which must
+                not be modified afterwards
+            
+        Returns:
+            The cached or newly computed value
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        
+        # Computed outside the lock so slow queries do not block hits
+        result = compute()
+        if self.capacity:
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+    
+    def clear(self):
+        """Drop every cached result (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Return the hit, miss and eviction counters and the current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'capacity': self.capacity
+            }
+
@@ -0,0 +1,189 @@
+"""
+Trigram inverted index for case-insensitive substring search.
+
+Track names and artists are lowercased and joined into one string per
+field. Every 3-character window of every value is mapped to the rows that
+contain it. A query looks up the posting lists of its own trigrams,
+intersects them to get candidate rows, and then checks each candidate for
+the literal substring. Queries shorter than three characters are answered
+by a vectorized scan of the joined text instead.
+
+The index is built with NumPy over Unicode code points. Its arrays can be
+saved and passed back in (see ``postings``) to skip the build, or the
+whole index restored from state() (see from_state).
+"""
+
+import numpy as np
+
+# Never appears in track or artist names, so it can separate rows
+SEPARATOR = '\x00'
+
+# Above this fraction of the catalog as candidates, a vectorized scan is
+# cheaper than verifying candidates one by one
+SCAN_FRACTION = 1 / 16
+
+# Bump whenever the posting lists are built differently so cached ones
+# are rebuilt
+POSTINGS_VERSION = 1
+
+
+def _trigram_keys(codepoints):
+    """Pack each window of three code points into one 64-bit key."""
+    codepoints = codepoints.astype(np.uint64)
+    return (codepoints[:-2] << np.uint64(42)) | (codepoints[1:-1] << np.uint64(21)) | codepoints[2:]
+
+
+class _Field:
+    """One text column, lowercased and joined into a single string."""
+    
+    def __init__(self, values=None, codepoints=None):
+        """
+        Args:
+            values: Value of every row
+            codepoints: Or the codepoints of a field built before, to skip
+                joining and lowercasing the values
+        """
+        if codepoints is None:
+            self.text = SEPARATOR.join(map(str, values)).lower()
+            codepoints = np.frombuffer(self.text.encode('utf-32-le'), dtype=np.uint32)
+        else:
+            self.text = np.asarray(codepoints).tobytes().decode('utf-32-le')
+        self.codepoints = codepoints
+        self.separators = np.flatnonzero(self.codepoints == 0)
+        self.starts = np.concatenate([[0], self.separators + 1])
+        self.ends = np.concatenate([self.separators, [len(self.codepoints)]])
+    
+    def trigram_rows(self):
+        """Return the (key, row) pair of every trigram within a row."""
+        if len(self.codepoints) < 3:
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.intp)
+        is_separator = self.codepoints == 0
+        valid = ~(is_separator[:-2] | is_separator[1:-1] | is_separator[2:])
+        positions = np.flatnonzero(valid)
+        keys = _trigram_keys(self.codepoints)[positions]
+        rows = np.searchsorted(self.separators, positions)
+        return keys, rows
+    
+    def contains(self, row, query):
+        """Return whether a row's value contains the query."""
+        return query in self.text[self.starts[row]:self.ends[row]]
+    
+    def scan(self, query):
+        """Return the sorted rows containing a short query, by full scan."""
+        codes = np.frombuffer(query.encode('utf-32-le'), dtype=np.uint32)
+        n_windows = len(self.codepoints) - len(codes) + 1
+        if n_windows <= 0:
+            return np.empty(0, dtype=np.intp)
+        match = np.ones(n_windows, dtype=bool)
+        for offset, code in enumerate(codes):
+            match &= self.codepoints[offset:offset + n_windows] == code
+        rows = np.searchsorted(self.separators, np.flatnonzero(match))
+        # Matches come in text order, so duplicates are adjacent
+        return rows[np.concatenate([[True], rows[1:] != rows[:-1]])] if len(rows) else rows
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over track names and artists.
+    
+    search() returns the same rows as a case-insensitive literal substring
+    match on either column.
+    """
+    
+    def __init__(self, track_names, artists, postings=None):
+        """
+        Args:
+            track_names: Track name of every row
+            artists: Artist string of every row
+            postings: Optional (keys, offsets, rows) arrays from a previous
+                build over the same values, to skip building
+        """
+        self.fields = [_Field(track_names), _Field(artists)]
+        self.n_rows = len(self.fields[0].starts)
+        if postings is not None:
+            self.keys, self.offsets, self.rows = postings
+            return
+        
+        pairs = [field.trigram_rows() for field in self.fields]
+        keys = np.concatenate([field_keys for field_keys, _ in pairs])
+        rows = np.concatenate([field_rows for _, field_rows in pairs])
+        order = np.lexsort((rows, keys))
+        keys, rows = keys[order], rows[order]
+        
+        # Drop repeated (trigram, row) pairs
+        if len(keys):
+            keep = np.concatenate([[True], (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])])
+            keys, rows = keys[keep], rows[keep]
+        
+        self.keys, first = np.unique(keys, return_index=True)
+        self.offsets = np.append(first, len(keys))
+        self.rows = rows.astype(np.int32)
+    
+    def state(self):
+        """Return the arrays from_state rebuilds the index from."""
+        return {
+            'name_codepoints': self.fields[0].codepoints,
+            'artist_codepoints': self.fields[1].codepoints,
+            'keys': self.keys, 'offsets': self.offsets, 'rows': self.rows
+        }
+    
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an index from state() without joining or lowercasing any value."""
+        index = cls.__new__(cls)
+        index.fields = [
+            _Field(codepoints=state['name_codepoints']),
+            _Field(codepoints=state['artist_codepoints'])
+        ]
+        index.n_rows = len(index.fields[0].starts)
+        index.keys, index.offsets, index.rows = state['keys'], state['offsets'], state['rows']
+        return index
+    
+    def _scan(self, query):
+        """Return the sorted rows matching a query in either field, by full scan."""
+        return np.union1d(*[field.scan(query) for field in self.fields])
+    
+    def _postings(self, key):
+        """Return the sorted rows containing a trigram key."""
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return np.empty(0, dtype=np.int32)
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+    
+    def search(self, query):
+        """
+        Find rows whose track name or artist contains the query.
+        
+        Args:
+            query: Text to search for (matched literally, case-insensitively)
+            
+        Returns:
+            Sorted NumPy array of row positions
+        """
+        query = query.lower()
+        if not query:
+            return np.arange(self.n_rows)
+        if SEPARATOR in query:
+            return np.empty(0, dtype=np.intp)
+        
+        if len(query) < 3:
+            return self._scan(query)
+        
+        codepoints = np.frombuffer(query.encode('utf-32-le'), dtype=np.uint32)
+        postings = sorted(
+            (self._postings(key) for key in np.unique(_trigram_keys(codepoints))),
+            key=len
+        )
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        
+        if len(candidates) > self.n_rows * SCAN_FRACTION:
+            return self._scan(query)
+        matches = [
+            row for row in candidates.tolist()
+            if any(field.contains(row, query) for field in self.fields)
+        ]
+        return np.array(matches, dtype=np.intp)
@@ -0,0 +1,353 @@
+"""
+JSON HTTP service for the music recommender.
+
+Serves one shared MusicRecommender over HTTP/1.1 with keep-alive, using
+only the standard library (asyncio streams). The event loop only parses
+requests and writes responses; every recommender call runs in a thread
+pool so a slow query never blocks other connections.
+
+Endpoints (all responses are JSON):
+- GET  /health
+- GET  /search?q=love&page=0&page_size=20
+- GET  /tracks/<track_id>/recommendations?n=10&exclude_same_artist=false
+       (also same_artist_only and split_artists)
+- POST /recommendations/features  with {"features": {...}, "n": 10}
+- GET  /moods
+- GET  /moods/<mood>?n=10
+- GET  /genres
+- GET  /genres/<genre>?page=0&page_size=20
+
+Run it with:
+    python service.py --port 8000
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from recommendation_engine import CARD_COLUMNS, create_recommender
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# Enough request threads for the micro-batcher to fill its batches
+DEFAULT_WORKERS = 32
+
+# Limits on what a single request may ask for
+MAX_LINE_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+MAX_RECOMMENDATIONS = 100
+MAX_PAGE_SIZE = 100
+
+# Fields returned for each track
+TRACK_FIELDS = CARD_COLUMNS + ['popularity']
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 414: 'URI Too Long', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class HTTPError(Exception):
+    """An error response with a status code."""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_value(name, value, maximum):
+    """Read a non-negative integer request value, capped at maximum."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPError(400, f"{name} must be an integer")
+    if value < 0:
+        raise HTTPError(400, f"{name} must not be negative")
+    return min(value, maximum)
+
+
+def _int_param(query, name, default, maximum):
+    """Read a non-negative integer query parameter, capped at maximum."""
+    values = query.get(name)
+    if not values:
+        return default
+    return _int_value(name, values[0], maximum)
+
+
+def _bool_param(query, name):
+    """Read a boolean query parameter (true/1/yes)."""
+    values = query.get(name)
+    return bool(values) and values[0].lower() in ('1', 'true', 'yes')
+
+
+def _json_default(value):
+    """Convert NumPy scalars and arrays for json.dumps."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class RecommendationService:
+    """HTTP front end for one shared MusicRecommender."""
+    
+    def __init__(self, recommender, workers=DEFAULT_WORKERS):
+        """
+        Args:
+            recommender: MusicRecommender shared by all requests
+            workers: Threads running recommender calls
+        """
+        self.recommender = recommender
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='recommender')
+    
+    async def _run(self, func, *args, **kwargs):
+        """Run a recommender call in the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+    
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as error:
+                    await self._respond(writer, error.status, {'error': error.message}, False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                status, payload = await self.dispatch(method, target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _read_request(self, reader):
+        """
+        Read one request from a connection.
+        
+        Returns:
+            Tuple of (method, target, version, headers, body), or None when
+            the connection was closed
+        """
+        line = await self._read_line(reader, 414, "Request line too long")
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await self._read_line(reader, 431, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HTTPError(431, "Too many headers")
+        
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length > 0 else b''
+        return method.upper(), target, version, headers, body
+    
+    async def _read_line(self, reader, status, message):
+        """
+        Read one line of the request head.
+        
+        Raises:
+            HTTPError: With the given status when the line is longer than
+                MAX_LINE_BYTES (readline reports that as a ValueError)
+        """
+        try:
+            return await reader.readline()
+        except ValueError:
+            raise HTTPError(status, message)
+    
+    async def _respond(self, writer, status, payload, keep_alive):
+        """Write a JSON response."""
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+    
+    async def dispatch(self, method, target, body=b''):
+        """
+        Route a request to its handler.
+        
+        Returns:
+            Tuple of (status code, JSON-serializable payload)
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        try:
+            if parts == ['recommendations', 'features']:
+                if method != 'POST':
+                    raise HTTPError(405, f"Method {method} not allowed")
+                return 200, await self._features(body)
+            if method != 'GET':
+                raise HTTPError(405, f"Method {method} not allowed")
+            return 200, await self._get(parts, query)
+        except HTTPError as error:
+            return error.status, {'error': error.message}
+        except Exception as error:
+            return 500, {'error': f"{type(error).__name__}: {error}"}
+    
+    async def _get(self, parts, query):
+        """Handle a GET request."""
+        recommender = self.recommender
+        if parts == ['health']:
+            # len(df) would merge pending catalog updates on the event loop
+            return {'status': 'ok', 'tracks': len(recommender.catalog)}
+        
+        if parts == ['search']:
+            text = query.get('q', [''])[0]
+            results = await self._run(recommender.search_tracks, text, TRACK_FIELDS)
+            return await self._page(results, query)
+        
+        if len(parts) == 3 and parts[0] == 'tracks' and parts[2] == 'recommendations':
+            track_id = parts[1]
+            if recommender.lookup(track_id) is None:
+                raise HTTPError(404, f"Unknown track {track_id!r}")
+            try:
+                tracks = await self._run(
+                    recommender.get_recommendations,
+                    track_id,
+                    _int_param(query, 'n', 10, MAX_RECOMMENDATIONS),
+                    exclude_same_artist=_bool_param(query, 'exclude_same_artist'),
+                    same_artist_only=_bool_param(query, 'same_artist_only'),
+                    split_artists=_bool_param(query, 'split_artists'),
+                    columns=TRACK_FIELDS
+                )
+            except ValueError as error:
+                raise HTTPError(400, str(error))
+            return {'track_id': track_id, 'tracks': tracks}
+        
+        if parts == ['moods']:
+            return {'moods': sorted(recommender.MOOD_PRESETS)}
+        
+        if len(parts) == 2 and parts[0] == 'moods':
+            mood = parts[1].lower()
+            if mood not in recommender.MOOD_PRESETS:
+                raise HTTPError(404, f"Unknown mood {parts[1]!r}")
+            tracks = await self._run(
+                recommender.get_mood_based_recommendations,
+                mood,
+                _int_param(query, 'n', 10, MAX_RECOMMENDATIONS),
+                columns=TRACK_FIELDS
+            )
+            return {'mood': mood, 'tracks': tracks}
+        
+        if parts == ['genres']:
+            counts = await self._run(recommender.get_genre_counts)
+            return {'genres': [{'genre': genre, 'count': count} for genre, count in counts.items()]}
+        
+        if len(parts) == 2 and parts[0] == 'genres':
+            genre = parts[1].lower()
+            if genre not in recommender.genre_index:
+                raise HTTPError(404, f"Unknown genre {parts[1]!r}")
+            results = await self._run(recommender.browse_genre, genre, columns=TRACK_FIELDS)
+            return await self._page(results, query)
+        
+        raise HTTPError(404, "Not found")
+    
+    async def _page(self, results, query):
+        """Return one page of a TrackResults handle."""
+        page = _int_param(query, 'page', 0, len(results))
+        page_size = _int_param(query, 'page_size', 20, MAX_PAGE_SIZE)
+        tracks = await self._run(results.page, page, page_size)
+        return {'total': len(results), 'page': page, 'page_size': page_size, 'tracks': tracks}
+    
+    async def _features(self, body):
+        """Handle POST /recommendations/features."""
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        features = request.get('features', {}) if isinstance(request, dict) else None
+        if not isinstance(features, dict):
+            raise HTTPError(400, "features must be an object")
+        try:
+            features = {name: float(value) for name, value in features.items()}
+        except (TypeError, ValueError, OverflowError):
+            raise HTTPError(400, "features must be numbers")
+        if not all(math.isfinite(value) for value in features.values()):
+            raise HTTPError(400, "features must be finite numbers")
+        n = _int_value('n', request.get('n', 10), MAX_RECOMMENDATIONS)
+        tracks = await self._run(
+            self.recommender.get_recommendations_by_features, features, n, columns=TRACK_FIELDS
+        )
+        return {'tracks': tracks}
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, recommender=None,
+                workers=DEFAULT_WORKERS):
+    """
+    Start the service and run until cancelled.
+    
+    Args:
+        host: Interface to listen on
+        port: TCP port (0 picks a free one)
+        recommender: MusicRecommender to serve (created with micro-batching
+            when None)
+        workers: Threads running recommender calls
+    """
+    if recommender is None:
+        recommender = create_recommender(low_memory=True, micro_batch=True)
+    service = RecommendationService(recommender, workers)
+    server = await asyncio.start_server(
+        service.handle_connection, host, port, limit=MAX_LINE_BYTES
+    )
+    address = server.sockets[0].getsockname()
+    print(f"Serving {len(recommender.df):,} tracks on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the recommender JSON HTTP service.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Recommender threads")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Versioned on-disk snapshots of a fully prepared recommender.
+
+A snapshot is a directory holding everything MusicRecommender prepares at
+startup: the catalog columns, the scaler range, the scaled and unit
+feature matrices, every index and the mood rankings. Restoring one
+memory-maps the arrays read-only instead of recomputing them (see
+MusicRecommender.load_snapshot), so startup costs little more than
+opening the files, and processes on one host share the pages.
+
+Layout of a snapshot directory:
+- manifest.json: format version, the recommender's metadata, the catalog
+  column descriptions and the BLAKE2 digest of every other file
+- catalog/: the catalog columns (see data.loader.write_columns)
+- <name>.npy: one file per array
+- <name>.txt: one NUL-separated string table per list of strings
+
+A snapshot is written to a temporary directory that is renamed into place
+once complete, so a half-written snapshot is never read.
+
+Build the default snapshot, which create_recommender() restores, with:
+    python snapshot.py --low-memory
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from data import loader
+
+FORMAT_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+CATALOG_DIR = 'catalog'
+
+
+class SnapshotError(ValueError):
+    """A snapshot is missing, corrupt, of another format or does not fit the request."""
+
+
+def default_snapshot_path(csv_path=None):
+    """Return the snapshot directory used for a dataset CSV by default."""
+    return os.path.splitext(csv_path or loader.FULL_DATASET_PATH)[0] + '.snapshot'
+
+
+def write_snapshot(path, meta, frame, state):
+    """
+    Write a snapshot directory, replacing any old one.
+    
+    Args:
+        path: Snapshot directory
+        meta: JSON-serializable metadata, returned as-is by read_snapshot
+        frame: Catalog DataFrame
+        state: Dict of name to NumPy array or list of strings. Names
+            become file names.
+    """
+    tmp_dir = f"{path}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        os.makedirs(os.path.join(tmp_dir, CATALOG_DIR))
+        columns = loader.write_columns(frame, os.path.join(tmp_dir, CATALOG_DIR))
+        
+        arrays = {}
+        tables = {}
+        for name, value in state.items():
+            if isinstance(value, np.ndarray):
+                arrays[name] = f"{name}.npy"
+                np.save(os.path.join(tmp_dir, arrays[name]), value)
+                continue
+            values = [str(item) for item in value]
+            if any('\0' in item for item in values):
+                raise ValueError(f"Strings of {name!r} contain NUL characters")
+            tables[name] = {'file': f"{name}.txt", 'length': len(values)}
+            with open(os.path.join(tmp_dir, tables[name]['file']), 'w', encoding='utf-8') as f:
+                f.write('\0'.join(values))
+        
+        files = sorted(
+            os.path.relpath(os.path.join(root, name), tmp_dir)
+            for root, _, names in os.walk(tmp_dir) for name in names
+        )
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'meta': meta,
+            'columns': columns,
+            'arrays': arrays,
+            'tables': tables,
+            'files': {name: loader.hash_file(os.path.join(tmp_dir, name)) for name in files}
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f)
+        
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp_dir, path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def read_snapshot(path, verify=True):
+    """
+    Open a snapshot directory written by write_snapshot.
+    
+    Args:
+        path: Snapshot directory
+        verify: Check every file against its digest in the manifest first.
+            This reads the whole snapshot once; without it only the files
+            are opened and the arrays mapped.
+            
+    Returns:
+        Tuple of (meta, catalog DataFrame, state). State arrays are
+        memory-mapped read-only.
+        
+    Raises:
+        SnapshotError: The snapshot is missing, corrupt or of another
+            format version
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as error:
+        raise SnapshotError(f"Cannot read snapshot {path}: {error}") from error
+    version = manifest.get('format_version') if isinstance(manifest, dict) else None
+    if version != FORMAT_VERSION:
+        raise SnapshotError(
+            f"Snapshot {path} has format version {version!r}, expected {FORMAT_VERSION}"
+        )
+    
+    try:
+        if verify:
+            for name, digest in manifest['files'].items():
+                if loader.hash_file(os.path.join(path, name)) != digest:
+                    raise SnapshotError(f"Snapshot file {name} in {path} fails its checksum")
+        
+        frame = loader.read_columns(os.path.join(path, CATALOG_DIR), manifest['columns'])
+        state = {
+            name: np.load(os.path.join(path, file_name), mmap_mode='r')
+            for name, file_name in manifest['arrays'].items()
+        }
+        for name, table in manifest['tables'].items():
+            with open(os.path.join(path, table['file']), encoding='utf-8') as f:
+                values = f.read().split('\0')
+            state[name] = values if table['length'] else []
+    except SnapshotError:
+        raise
+    except (OSError, ValueError, KeyError) as error:
+        raise SnapshotError(f"Cannot read snapshot {path}: {error}") from error
+    return manifest['meta'], frame, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Save a prepared recommender as a snapshot.")
+    parser.add_argument('--path', default=None, help="Snapshot directory (defaults to the dataset's)")
+    parser.add_argument('--dtype', default='float32', choices=['float32', 'float64'])
+    parser.add_argument('--search', default='exact', choices=['exact', 'ann', 'quantized'])
+    parser.add_argument('--low-memory', action='store_true', help="Snapshot the compact catalog")
+    args = parser.parse_args()
+    
+    from recommendation_engine import MusicRecommender
+    
+    start = time.perf_counter()
+    recommender = MusicRecommender(
+        dtype=args.dtype, search=args.search, low_memory=args.low_memory,
+        cache_size=0, use_neighbor_graph=False
+    )
+    path = args.path or default_snapshot_path()
+    recommender.save_snapshot(path)
+    print(f"Wrote snapshot of {len(recommender.df):,} tracks to {path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Result materialization: turning row positions into track dicts.
+
+gather() builds the output of every recommender method. It reads each
+requested column once for all rows, instead of building a Series per row,
+and can return either a list of track dicts or one array per column.
+
+TrackResults is a lazily materialized result set for search and browse.
+A query only resolves to an array of row positions. Track dicts are built
+for the rows that are actually shown, one page at a time, so the cost of
+showing a page does not depend on how many tracks matched.
+"""
+
+import numpy as np
+
+from catalog_updates import Catalog
+
+# Tracks per page when the caller does not choose
+DEFAULT_PAGE_SIZE = 20
+
+
+def gather(df, rows, columns=None, extra=None, columnar=False):
+    """
+    Read catalog rows in one vectorized pass per column.
+    
+    Args:
+        df: Catalog DataFrame, or a Catalog with appended tracks
+        rows: Row positions to read, in output order
+        columns: Columns to include (all columns when None)
+        extra: Optional dict of additional per-row values, e.g. scores,
+            added after the catalog columns
+        columnar: Return one NumPy array per column instead of records
+        
+    Returns:
+        List of track dicts, or a dict of column name to array when
+        columnar is true
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    if columns is None:
+        columns = df.columns
+    if isinstance(df, Catalog):
+        values = {column: df.values_at(column, rows) for column in columns}
+    else:
+        values = {column: df[column].values[rows] for column in columns}
+    if extra:
+        values.update(extra)
+    
+    if columnar:
+        return {column: np.asarray(array) for column, array in values.items()}
+    names = list(values)
+    lists = [values[name].tolist() if hasattr(values[name], 'tolist') else list(values[name])
+             for name in names]
+    return [dict(zip(names, record)) for record in zip(*lists)]
+
+
+class TrackResults:
+    """
+    Handle on the rows matched by a query.
+    
+    Behaves like a read-only list of track dicts: len() is the total number
+    of matches, indexing or slicing materializes only the requested rows,
+    and iterating walks the matches one page at a time.
+    """
+    
+    def __init__(self, df, rows, columns=None):
+        """
+        Args:
+            df: Catalog DataFrame or Catalog the rows point into
+            rows: Row positions of the matches, in result order
+            columns: Columns to include in each track dict (all when None)
+        """
+        self.df = df
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.columns = columns
+    
+    @property
+    def total(self):
+        """Total number of matches."""
+        return len(self.rows)
+    
+    def __len__(self):
+        return self.total
+    
+    def __bool__(self):
+        return self.total > 0
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._records(self.rows[key])
+        return self._records(self.rows[[key]])[0]
+    
+    def __iter__(self):
+        for start in range(0, self.total, DEFAULT_PAGE_SIZE):
+            yield from self.slice(start, DEFAULT_PAGE_SIZE)
+    
+    def n_pages(self, page_size=DEFAULT_PAGE_SIZE):
+        """Number of pages of page_size tracks (at least 1)."""
+        return max(-(-self.total // page_size), 1)
+    
+    def slice(self, offset, limit):
+        """
+        Return up to limit track dicts starting at a result offset.
+        
+        Args:
+            offset: Position of the first result
+            limit: Maximum number of results
+            
+        Returns:
+            List of track dicts
+        """
+        offset = max(int(offset), 0)
+        return self._records(self.rows[offset:offset + max(int(limit), 0)])
+    
+    def page(self, number, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Return one page of track dicts.
+        
+        Args:
+            number: Page number, starting at 0
+            page_size: Results per page
+            
+        Returns:
+            List of track dicts (empty past the last page)
+        """
+        return self.slice(number * page_size, page_size)
+    
+    def _records(self, rows):
+        """Turn row positions into track dicts."""
+        return gather(self.df, rows, self.columns)